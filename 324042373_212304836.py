@@ -1,6 +1,23 @@
+import argparse
+import asyncio
+import bisect
+import builtins
+import contextlib
+import json
+import math
+import multiprocessing
+import operator
+import os
+import pickle
+import platform
 import random
+import struct
+import sys
+import time
+import timeit
+import zlib
 import numpy as np
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # --- Utility Functions ---
 
@@ -44,24 +61,48 @@ def get_valid_choice(prompt, choices):
             return choice
         print(f"Please enter one of the following: {', '.join(choices)}")
 
+def seat_position(seat, num_seats):
+    """
+    Returns the (x, y) position of a seat in the table image. Seats are spread
+    evenly along the lower half of the table from right (seat 1) to left; with
+    three seats this is the classic right/bottom/left layout.
+    Args:
+        seat (int): The seat number, from 1.
+        num_seats (int): How many seats the table has.
+    Returns:
+        tuple: (x, y) in axes coordinates.
+    """
+    if num_seats == 1:
+        return (0.5, 0.1)
+    angle = math.pi * (seat - 1) / (num_seats - 1)
+    return (round(0.5 + 0.35 * math.cos(angle), 6), round(0.5 - 0.4 * math.sin(angle), 6))
+
 def draw_table_by_seat_with_ranks(players_with_seats, player_sit, ranked_list, filename='table_summary.png'):
     """
     Generates and saves a visual representation of the game table using matplotlib.
     It shows each player, their chip count, and their rank at their chosen seat.
     Args:
         players_with_seats (dict): A dictionary mapping seat number to Player objects.
-        player_sit (int): The seat number of the human player.
+        player_sit (int or list of int): The seat number(s) of the human players.
         ranked_list (list): A sorted list of player data used to determine ranks.
         filename (str): The name of the file to save the image as.
     """
-    # Define fixed positions for seats to ensure consistent layout
-    seat_positions = {1: (0.85, 0.5), 2: (0.5, 0.1), 3: (0.15, 0.5)}
-    fig, ax = plt.subplots(figsize=(7, 5))
+    # matplotlib is only imported when an image is actually drawn; the Figure API
+    # (no pyplot) keeps drawing safe on the background threads of SummaryRenderer
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Circle
+
+    # Positions depend only on the number of seats, for a consistent layout
+    num_seats = len(players_with_seats)
+    seat_positions = {seat: seat_position(seat, num_seats) for seat in range(1, num_seats + 1)}
+    human_seats = {player_sit} if isinstance(player_sit, int) else set(player_sit)
+    fig = Figure(figsize=(7, 5))
+    ax = fig.add_subplot()
     ax.set_facecolor('seagreen')
-    plt.axis('off')# Hide the axis for a cleaner look
+    ax.axis('off')# Hide the axis for a cleaner look
 
     # Draw the green table circle
-    table = plt.Circle((0.5, 0.5), 0.4, color='seagreen', zorder=0)
+    table = Circle((0.5, 0.5), 0.4, color='seagreen', zorder=0)
     ax.add_artist(table)
 
     # Create a mapping from player name to their rank for easy lookup
@@ -71,7 +112,7 @@ def draw_table_by_seat_with_ranks(players_with_seats, player_sit, ranked_list, f
     for seat, player in players_with_seats.items():
         name = player.name
         chips = player.chips
-        is_human = seat == player_sit
+        is_human = seat in human_seats
         rank = ranking_map.get(name, '?') # Get rank, default to '?' if not found
 
         # Customize label and color for the human player vs. bots
@@ -81,34 +122,208 @@ def draw_table_by_seat_with_ranks(players_with_seats, player_sit, ranked_list, f
         else:
             label = f'{name}\n#{rank}\n{chips} chips'
             # Differentiate between the two bots by color
-            color = 'blue' if seat!= player_sit and 'Bot1' in name else 'red'
+            color = 'blue' if 'Bot1' in name else 'red'
 
         pos = seat_positions.get(seat, (0.5, 0.5))
         ax.text(pos[0], pos[1], label, ha='center', va='center', fontsize=10,
                 bbox=dict(boxstyle='round', fc=color, ec='black'))
 
-    plt.savefig(filename, bbox_inches='tight')
-    plt.close()
+    fig.savefig(filename, bbox_inches='tight')
+
+class SeatView:
+    """The name and chip count of a seated player, frozen at the time of a snapshot."""
+    def __init__(self, name, chips):
+        self.name = name
+        self.chips = chips
+
+def _render_summary(job):
+    """Worker entry point of SummaryRenderer: draws one table image and returns its file name."""
+    players_with_seats, player_sit, ranked_list, filename = job
+    draw_table_by_seat_with_ranks(players_with_seats, player_sit, ranked_list, filename)
+    return filename
+
+class SummaryRenderer:
+    """
+    Draws table summary images in the background so the game never waits for matplotlib.
+    Jobs are snapshots of plain values, so the table can keep playing while an image
+    of an earlier round is drawn. Threads are used by default; processes render
+    large batches in parallel.
+    Args:
+        max_workers (int): Number of rendering workers.
+        use_processes (bool): Render in worker processes instead of threads.
+    """
+    def __init__(self, max_workers=1, use_processes=False):
+        if use_processes:
+            self.executor = ProcessPoolExecutor(max_workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='summary-render')
+        self.futures = []
+
+    def submit(self, players_with_seats, player_sit, ranked_list, filename='table_summary.png'):
+        """
+        Queues one image (same arguments as draw_table_by_seat_with_ranks).
+        Returns:
+            concurrent.futures.Future: Resolves to the file name once the image is saved.
+        """
+        snapshot = {seat: SeatView(p.name, p.chips) for seat, p in players_with_seats.items()}
+        future = self.executor.submit(_render_summary, (snapshot, player_sit, list(ranked_list), filename))
+        self.futures.append(future)
+        return future
+
+    def render_many(self, jobs):
+        """
+        Batch mode: renders the summaries of many sessions on the worker pool.
+        Args:
+            jobs (iterable): (players_with_seats, player_sit, ranked_list, filename) tuples.
+        Returns:
+            list of str: The saved file names, in job order.
+        """
+        futures = [self.submit(*job) for job in jobs]
+        return [future.result() for future in futures]
+
+    def wait(self):
+        """Blocks until every queued image is saved, re-raising the first rendering error."""
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """Waits for queued images and stops the workers."""
+        self.wait()
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 # --- Core Game Classes ---
 
+SUITS = ['♠', '♥', '♦', '♣']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+# Blackjack points of each rank with aces counted as 1
+RANK_POINTS = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9,
+               '10': 10, 'J': 10, 'Q': 10, 'K': 10, 'A': 1}
+
 class Card:
-    """Represents a single playing card with a suit and a rank."""
-    def __init__(self, suit, rank):
-        self.suit = suit
-        self.rank = rank
+    """
+    Represents a single playing card with a suit and a rank.
+    Cards are immutable and interned: Card(suit, rank) always returns the one shared
+    instance of that card (see CARDS), with its blackjack points (aces as 1), its
+    integer code and its display string computed once.
+    Raises:
+        ValueError: If the suit or rank is unknown.
+    """
+    __slots__ = ('suit', 'rank', 'points', 'code', '_text')
+    _interned = {}
+
+    def __new__(cls, suit, rank):
+        card = cls._interned.get((suit, rank))
+        if card is None:
+            if suit not in SUITS or rank not in RANK_POINTS:
+                raise ValueError(f'Unknown card: {rank}{suit}')
+            card = object.__new__(cls)
+            fields = (suit, rank, RANK_POINTS[rank], SUITS.index(suit) * 13 + RANKS.index(rank), f'{rank}{suit}')
+            for name, value in zip(cls.__slots__, fields):
+                object.__setattr__(card, name, value)
+            cls._interned[(suit, rank)] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Cards are immutable.')
+
+    def __delattr__(self, name):
+        raise AttributeError('Cards are immutable.')
+
+    def __reduce__(self):
+        """Pickles and copies a card as its suit and rank, so it unpickles to the shared instance."""
+        return Card, (self.suit, self.rank)
 
     def __str__(self):
         """Provides a simple string representation of the card, e.g., 'K♠'."""
-        return f'{self.rank}{self.suit}'
+        return self._text
+
+# The shared Card of every code, so decks can be rebuilt without allocating cards
+CARDS = [Card(suit, rank) for suit in SUITS for rank in RANKS]
+# Point index (0 for aces, 1-8 for twos to nines, 9 for tens) of every card code
+POINT_INDEX = [card.points - 1 for card in CARDS]
+
+# Card counting tags by point index: aces, 2, 3, ..., 9, ten-valued cards
+COUNT_SYSTEMS = {
+    'hi-lo': (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1),
+    'ko': (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1),
+    'hi-opt1': (0, 0, 1, 1, 1, 1, 0, 0, 0, -1),
+    'hi-opt2': (0, 1, 1, 2, 2, 1, 1, 0, 0, -2),
+    'omega2': (0, 1, 1, 2, 2, 2, 1, 0, -1, -2),
+    'zen': (-1, 1, 1, 2, 2, 2, 1, 0, 0, -2),
+}
+
+class ShoeTracker:
+    """
+    The composition of the cards left in a deck or shoe, kept up to date as cards
+    are dealt (O(1) per card) and reset on reshuffle. Running and true counts of
+    any system in COUNT_SYSTEMS are computed from the ten point counts, so asking
+    never scans the cards. KO is unbalanced and counted from 0.
+    Args:
+        num_decks (int): Number of 52-card decks in the full shoe.
+    """
+    def __init__(self, num_decks=1):
+        self.reset(num_decks)
+
+    def reset(self, num_decks=None):
+        """Back to a full shoe, e.g. after a reshuffle."""
+        if num_decks is not None:
+            self.num_decks = num_decks
+        self.counts = [4 * self.num_decks] * 9 + [16 * self.num_decks]
+        self.cards_remaining = 52 * self.num_decks
+
+    def sync(self, point_indices, num_decks):
+        """Recounts from the point indices of the cards left, e.g. when tracking starts mid-shoe."""
+        self.num_decks = num_decks
+        self.counts = [0] * 10
+        for index in point_indices:
+            self.counts[index] += 1
+        self.cards_remaining = sum(self.counts)
+
+    def remove(self, index):
+        """Takes one card of the given point index out of the shoe."""
+        self.counts[index] -= 1
+        self.cards_remaining -= 1
+
+    def remaining(self, points):
+        """Returns how many cards worth `points` (1 for aces, 10 for tens) are left."""
+        return self.counts[points - 1]
+
+    def composition(self):
+        """Returns the ten counts in the format of shoe_composition(), e.g. for ExactEV."""
+        return tuple(self.counts)
+
+    def running_count(self, system='hi-lo'):
+        """Returns the running count of the dealt cards."""
+        tags = COUNT_SYSTEMS[system]
+        # The count of the dealt cards is that of the full shoe minus that of the cards left
+        full = (4 * sum(tags) + 12 * tags[9]) * self.num_decks
+        return full - sum(map(operator.mul, tags, self.counts))
+
+    def decks_remaining(self):
+        """Returns the number of decks left to deal."""
+        return self.cards_remaining / 52
+
+    def true_count(self, system='hi-lo'):
+        """Returns the running count per deck left (0 when the shoe is empty)."""
+        if not self.cards_remaining:
+            return 0.0
+        return self.running_count(system) / self.decks_remaining()
 
 class Deck:
     """Represents a deck of 52 playing cards."""
     def __init__(self, seed=None):
-        self.suits = ['♠', '♥', '♦', '♣']
-        self.ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        self.cards = [Card(suit, rank) for suit in self.suits for rank in self.ranks]
+        self.suits = SUITS
+        self.ranks = RANKS
+        self.cards = list(CARDS)
         self.seed = seed
+        self.tracker = None
         # If a seed is provided, use it for the random number generator for reproducible shuffles.
         if self.seed is not None:
             random.seed(self.seed)
@@ -121,54 +336,222 @@ class Deck:
     def deal_card(self):
         """Removes and returns the top card from the deck."""
         if self.cards:
-            return self.cards.pop(0)
+            card = self.cards.pop(0)
+            if self.tracker is not None:
+                self.tracker.remove(card.points - 1)
+            return card
         raise ValueError('The deck is empty.')
 
+    def cards_remaining(self):
+        """Returns the number of cards left to deal."""
+        return len(self.cards)
+
+    def needs_shuffle(self):
+        """The table rule: reshuffle once 20 or fewer cards are left."""
+        return len(self.cards) <= 20
+
+    def reshuffle(self):
+        """Gathers all 52 cards back into the deck and shuffles it."""
+        self.cards = list(CARDS)
+        self.shuffle()
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def track(self, tracker=None):
+        """
+        Keeps a ShoeTracker up to date with this deck from now on.
+        Args:
+            tracker (ShoeTracker, optional): The tracker to use. Defaults to a new one.
+        Returns:
+            ShoeTracker: The tracker, synced with the cards left.
+        """
+        if tracker is None:
+            tracker = ShoeTracker()
+        tracker.sync((card.points - 1 for card in self.cards), 1)
+        self.tracker = tracker
+        return tracker
+
+    def getstate(self):
+        """
+        Returns the deck order as compact plain values for a checkpoint. The global
+        random state the deck shuffles with is not included; GameManager saves it.
+        """
+        return (self.seed, bytes(card_code(card) for card in self.cards))
+
+    def setstate(self, state):
+        """Restores the deck order saved by getstate()."""
+        self.seed, codes = state
+        self.cards = [CARDS[code] for code in codes]
+        if self.tracker is not None:
+            self.track(self.tracker)
+
+class Shoe:
+    """
+    A shoe of one or more decks stored as uint8 card codes and dealt from a cursor.
+    Dealing is O(1), reshuffling happens in place, and the shoe owns its own RNG
+    instead of reseeding the global random module.
+    Args:
+        num_decks (int): Number of 52-card decks in the shoe.
+        penetration (float): Fraction of the shoe dealt before the cut card comes out.
+        seed (int, optional): Seed for the shoe's RNG.
+    """
+    def __init__(self, num_decks=6, penetration=0.75, seed=None):
+        if num_decks < 1:
+            raise ValueError('A shoe needs at least one deck.')
+        if not 0 < penetration <= 1:
+            raise ValueError('Penetration must be between 0 and 1.')
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.seed = seed
+        self.codes = bytearray(range(52)) * num_decks
+        # NumPy view over the same memory, used for in-place shuffles
+        self._view = np.frombuffer(self.codes, dtype=np.uint8)
+        self.cut_card = int(len(self.codes) * penetration)
+        self.cursor = 0
+        self.rng = np.random.default_rng(seed)
+        self.tracker = None
+        self.shuffle()
+
+    def shuffle(self):
+        """Shuffles all cards in place and moves the cursor back to the top."""
+        self.rng.shuffle(self._view)
+        self.cursor = 0
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def deal_code(self):
+        """Returns the code of the next card in the shoe."""
+        if self.cursor >= len(self.codes):
+            raise ValueError('The shoe is empty.')
+        code = self.codes[self.cursor]
+        self.cursor += 1
+        if self.tracker is not None:
+            self.tracker.remove(POINT_INDEX[code])
+        return code
+
+    def deal_card(self):
+        """Returns the next card in the shoe."""
+        return CARDS[self.deal_code()]
+
+    def cards_remaining(self):
+        """Returns the number of cards left before the end of the shoe."""
+        return len(self.codes) - self.cursor
+
+    def needs_shuffle(self):
+        """Checks if the cut card has been reached."""
+        return self.cursor >= self.cut_card
+
+    def reshuffle(self):
+        """Puts every card back and shuffles the shoe."""
+        self.shuffle()
+
+    def getstate(self):
+        """Returns the card order, cursor and RNG state as compact plain values for a checkpoint."""
+        return (self.seed, bytes(self.codes), self.cursor, self.rng.bit_generator.state)
+
+    def setstate(self, state):
+        """Restores a state saved by getstate() into a shoe of the same size."""
+        self.seed, codes, self.cursor, rng_state = state
+        # Copy in place so _view keeps pointing at the cards
+        self.codes[:] = codes
+        self.rng.bit_generator.state = rng_state
+        if self.tracker is not None:
+            self.track(self.tracker)
+
+    def track(self, tracker=None):
+        """
+        Keeps a ShoeTracker up to date with this shoe from now on.
+        Args:
+            tracker (ShoeTracker, optional): The tracker to use. Defaults to a new one.
+        Returns:
+            ShoeTracker: The tracker, synced with the cards left.
+        """
+        if tracker is None:
+            tracker = ShoeTracker(self.num_decks)
+        tracker.sync((POINT_INDEX[code] for code in self.codes[self.cursor:]), self.num_decks)
+        self.tracker = tracker
+        return tracker
+
+    def __getstate__(self):
+        # The NumPy view can't be pickled as a view of codes; it is rebuilt on load
+        state = self.__dict__.copy()
+        del state['_view']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._view = np.frombuffer(self.codes, dtype=np.uint8)
+
 class Hand:
     """Represents the cards held by a player the dealer or the bots."""
+    __slots__ = ('cards', 'hard_total', 'aces')
+
     def __init__(self):
         self.cards = []
+        # Running totals so get_value() doesn't re-walk the cards: aces counted as 1
+        self.hard_total = 0
+        self.aces = 0
 
     def add_card(self, card):
         """Adds a card to the hand."""
         self.cards.append(card)
+        points = card.points
+        self.hard_total += points
+        if points == 1:
+            self.aces += 1
 
     def reset(self):
         """Clears all cards from the hand."""
         self.cards = []
+        self.hard_total = 0
+        self.aces = 0
 
     def get_value(self):
         """
-        Calculates and returns the total value of the hand.
-        It correctly handles the value of Aces (as 1 or 11).
+        Returns the total value of the hand.
+        At most one ace can count as 11 without busting, so it is the hard total
+        plus 10 when an ace is present and there is room for it.
         """
-        total = 0
-        aces = 0
-        for card in self.cards:
-            if card.rank == 'A':
-                aces = aces + 1
-            else:
-                if card.rank in ['J', 'Q', 'K']:
-                    total = total + 10
-                else:
-                    total = total + int(card.rank)
+        if self.aces and self.hard_total <= 11:
+            return self.hard_total + 10
+        return self.hard_total
 
-        # Handle aces: add them as 11 if possible without busting, otherwise as 1.
-        for i in range(aces):
-            if total + 11 <= 21 - (aces - 1):
-                total += 11
-            else:
-                total += 1
-        return total
+    def is_soft(self):
+        """Checks if an ace is currently counted as 11."""
+        return self.aces > 0 and self.hard_total <= 11
+
+    def is_blackjack(self):
+        """Checks for a natural: 21 with the first two cards."""
+        return len(self.cards) == 2 and self.get_value() == 21
+
+    def is_pair(self):
+        """Checks if the hand is two cards of the same point value, which may be split."""
+        return len(self.cards) == 2 and self.cards[0].points == self.cards[1].points
+
+    def pop_card(self):
+        """Removes and returns the last card, e.g. to split a pair."""
+        card = self.cards.pop()
+        points = card.points
+        self.hard_total -= points
+        if points == 1:
+            self.aces -= 1
+        return card
 
 class Player:
     """A base class representing a player at the table."""
+    __slots__ = ('name', 'chips', 'hand', 'bet', 'total_chips_added', 'splits', 'insurance', 'surrendered')
+
     def __init__(self, name, chips):
         self.name = name
         self.chips = chips
         self.hand = Hand()
         self.bet = 0
         self.total_chips_added = chips
+        # Rule-dependent state of the round: split-off hands as [Hand, bet] pairs,
+        # played after self.hand, the insurance bet and whether the hand was surrendered
+        self.splits = []
+        self.insurance = 0
+        self.surrendered = False
 
     def __str__(self):
         """String representation of the player's current status."""
@@ -193,33 +576,92 @@ class Player:
         """Resets the player's hand and bet for a new round."""
         self.hand.reset()
         self.bet = 0
+        if self.splits:
+            self.splits = []
+        self.insurance = 0
+        self.surrendered = False
+
+    def total_bet(self):
+        """Returns everything wagered this round: the bet, split hands' bets and insurance."""
+        if self.splits:
+            return self.bet + self.insurance + sum(bet for _, bet in self.splits)
+        return self.bet + self.insurance
 
 class BotPlayer(Player):
-    """Represents an AI-controlled player with a simple, fixed strategy."""
-    def __init__(self, name, chips, seed):
+    """
+    Represents an AI-controlled player.
+    Without a strategy table it uses a simple, fixed rule; with one (see Strategy)
+    it looks its decision up by hand total and dealer upcard.
+    Args:
+        name (str): The bot's name.
+        chips (int): Starting chips.
+        seed (int): Seed of the bot's own random generator.
+        strategy (Strategy, optional): Hit/stand table.
+        betting (BetSizer, optional): Sizes the bets. Defaults to the classic random bet.
+        rebuy (RebuyPolicy, optional): Chips bought when broke. Defaults to doubling
+            the chips bought so far.
+    """
+    __slots__ = ('seed', 'rng', 'strategy', 'betting', 'rebuy', 'tracker')
+
+    def __init__(self, name, chips, seed, strategy=None, betting=None, rebuy=None):
         super().__init__(name, chips)
         self.seed = seed
         self.rng = random.Random(seed)
+        self.strategy = strategy
+        self.betting = betting
+        self.rebuy = rebuy
+        # The table's ShoeTracker while the shoe is tracked (see GameManager.track_shoe)
+        self.tracker = None
 
-    def decide_move(self):
+    def decide_move(self, dealer_card=None, hand=None, options=None):
         """
-        A simple AI strategy: hit if hand value is less than 17, otherwise stand.
+        Uses the bot's strategy table when it has one and the dealer's upcard is known.
+        Otherwise a simple AI strategy: hit if hand value is less than 17, otherwise stand.
         This is a common "basic strategy" rule.
+        Args:
+            dealer_card (Card, optional): The dealer's upcard.
+            hand (Hand, optional): The hand to play. Defaults to the bot's hand.
+            options (list of str, optional): The moves the rules allow (see Strategy.decide).
         """
-        if self.hand.get_value() < 17:
+        if hand is None:
+            hand = self.hand
+        if self.strategy is not None and dealer_card is not None:
+            return self.strategy.decide(hand, dealer_card, options)
+        if hand.get_value() < 17:
             return 'hit'
         return 'stand'
 
+    def wants_insurance(self):
+        """Bots insure only when they track the shoe and the Hi-Lo true count is 3 or more."""
+        return self.tracker is not None and self.tracker.true_count() >= 3
+
     def place_random_bet(self, min_bet=1):
         """Places a random bet between a minimum value and all their chips."""
         max_bet = self.chips
         return self.rng.randint(min_bet, max_bet)
 
+    def next_bet(self):
+        """Returns the bot's bet for the coming round, sized from its chips and the true count."""
+        if self.betting is None:
+            return self.place_random_bet()
+        true_count = 0.0 if self.tracker is None else self.tracker.true_count()
+        return self.betting.bet(self.chips, true_count, self.rng)
+
+    def rebuy_amount(self):
+        """Returns how many chips the bot buys after going broke."""
+        if self.rebuy is None:
+            return self.total_chips_added
+        return self.rebuy.amount(self)
+
 class Dealer(Player):
     """Represents the dealer, with special rules for playing their hand."""
+    __slots__ = ('hidden_card', 'hit_soft_17')
+
     def __init__(self):
         super().__init__('Dealer', chips=0)
         self.hidden_card = None
+        # Set from the table's Rules: hit soft 17 (H17) instead of standing (S17)
+        self.hit_soft_17 = False
 
     def set_hidden_card(self, card):
         """Sets the dealer's face-down card."""
@@ -231,276 +673,3503 @@ class Dealer(Player):
         return self.hidden_card
 
     def should_draw(self):
-        """The dealer's rule: must draw until their hand value is 17 or more."""
-        return self.hand.get_value() < 17
+        """The dealer's rule: must draw until their hand value is 17 or more (and on soft 17 under H17)."""
+        value = self.hand.get_value()
+        return value < 17 or (value == 17 and self.hit_soft_17 and self.hand.is_soft())
 
-class GameManager:
-    """Manages the overall flow of the Blackjack game."""
-    def __init__(self, player_name, player_chips, player_sit, deck_seed):
-        self.deck = Deck(seed=deck_seed)
-        self.player = Player(player_name, player_chips)
-        self.bots = []
-        self.dealer = Dealer()
-        self.player_sit = player_sit
+# --- Batch Hand Evaluation ---
 
-    def load_players_from_file(self, filepath):
-        """Loads bot player data from a text file."""
-        self.bots = []
-        try:
-            with open(filepath, 'r') as file:
-                for line in file:
-                    parts = line.strip().split(',')
-                    if len(parts) == 3:
-                        name = parts[0]
-                        chips = int(parts[1])
-                        seed = int(parts[2])
-                        self.bots.append(BotPlayer(name, chips, seed))
-        except FileNotFoundError:
-                print(f'File not found: {filepath}')
-                return
-        except ValueError:
-                print('Invalid data format in player file.')
-                return None
-        for bot in self.bots:
-            print(bot)
+# Cards are encoded as small integers (Card.code): suit index * 13 + rank index, the order Deck builds them in
+NO_CARD = 255  # Padding code for hands shorter than the array width
+# Points of every code (aces as 1); the padding code is worth nothing
+CODE_POINTS = np.zeros(256, dtype=np.int16)
+CODE_POINTS[:52] = [RANK_POINTS[rank] for suit in SUITS for rank in RANKS]
 
-    def start_game(self):
-        """Initiates and runs the main game loop."""
-        print('Welcome to Blackjack!')
-        print('Nothing is left to chance when you are an engineer.')
+def card_code(card):
+    """Returns the integer code of a Card."""
+    return card.code
 
-        deck_seed = get_valid_int('Enter a seed value for the game: ')
-        self.deck = Deck(seed=deck_seed)
+def encode_hands(hands, max_cards=None):
+    """
+    Packs a list of Hand objects into a uint8 code array for evaluate_hands().
+    Args:
+        hands (list of Hand): The hands to encode.
+        max_cards (int, optional): Width of the array. Defaults to the longest hand.
+    Returns:
+        np.ndarray: Array of shape (len(hands), max_cards) padded with NO_CARD.
+    """
+    if max_cards is None:
+        max_cards = max((len(h.cards) for h in hands), default=0)
+    codes = np.full((len(hands), max_cards), NO_CARD, dtype=np.uint8)
+    for i, hand in enumerate(hands):
+        for j, card in enumerate(hand.cards):
+            codes[i, j] = card_code(card)
+    return codes
 
-        # Main game loop
-        while True:
-            print(f'\n{self.player.name}, you have {self.player.chips} chips.')
+def evaluate_hands(codes):
+    """
+    Computes blackjack totals for a whole batch of hands at once.
+    Uses the same ace rule as Hand.get_value(): one ace counts as 11 if that doesn't bust.
+    Args:
+        codes (np.ndarray): uint8 array of shape (hands, cards) padded with NO_CARD.
+    Returns:
+        tuple: (totals, soft) arrays, the best total of each hand and whether it is soft.
+    """
+    points = CODE_POINTS[codes]
+    hard = points.sum(axis=1)
+    soft = (points == 1).any(axis=1) & (hard <= 11)
+    return hard + 10 * soft, soft
 
-            # Handle player running out of chips
-            if self.player.chips == 0:
-                choice = get_valid_choice('You have no chips left. Do you want to buy more? (yes/no): ', ['yes', 'no'])
-                if choice == 'yes':
-                    amount = get_valid_int('Enter amount of chips to add: ', min_val=100, max_val=1000)
-                    self.player.chips = amount
-                    self.player.total_chips_added += amount
-                else:
-                    print('You chose to leave the table.')
-                    break
+# --- Exact Expected Value ---
 
-            # Ask if the player wants to continue playing
-            play = get_valid_choice('Do you want to play a round? (yes/no): ', ['yes', 'no'])
-            if play!= 'yes':
-                print('You chose to leave the table.')
-                break
+# Index of the bust outcome in a dealer distribution; indexes 0-21 are final totals
+DEALER_BUST = 22
 
-            # Reset hands and bets for a new round
-            self.player.reset_hand()
-            self.dealer.reset_hand()
-            for bot in self.bots:
-                bot.reset_hand()
+def shoe_composition(num_decks=1, removed=()):
+    """
+    Counts the cards left in a shoe by point value.
+    Args:
+        num_decks (int): Number of decks in the full shoe.
+        removed (iterable of Card): Cards already out of the shoe.
+    Returns:
+        tuple: Ten counts, index 0 for aces, 1-8 for twos to nines and 9 for ten-valued cards.
+    """
+    counts = [4 * num_decks] * 9 + [16 * num_decks]
+    for card in removed:
+        counts[card.points - 1] -= 1
+    return tuple(counts)
 
-            self.handle_bets()
-            self.play_round()
-            self.resolve_results()
+def _without(composition, index):
+    """Returns the composition with one card of the given index removed."""
+    return composition[:index] + (composition[index] - 1,) + composition[index + 1:]
 
-            # Reshuffle the deck if it's getting low on cards
-            if len(self.deck.cards) <= 20:
-                self.deck.cards = [Card(suit, rank) for suit in self.deck.suits for rank in self.deck.ranks]
-                self.deck.shuffle()
+class ExactEV:
+    """
+    Exact dealer outcomes and player expected values for the table's rules.
+    The dealer draws below 17 (standing on soft 17, like Dealer.should_draw), bets
+    pay 1:1 and a busted player loses even if the dealer busts. The dealer's hole
+    card is still unknown, so it stays in the composition. Results are memoized by
+    hand state and remaining shoe composition.
+    Args:
+        num_decks (int): Number of decks used for the default composition.
+    """
+    def __init__(self, num_decks=1):
+        self.num_decks = num_decks
+        self._dealer_cache = {}
+        self._stand_cache = {}
+        self._hit_cache = {}
 
-        self.show_summary()
+    def default_composition(self, hand, upcard):
+        """The full shoe without the player's cards and the dealer's upcard."""
+        return shoe_composition(self.num_decks, list(hand.cards) + [upcard])
 
-    def play_round(self):
-        """Manages the logic for a single round of Blackjack."""
-        print()
-        num_players = len(self.bots) + 1
+    def _dealer_outcomes(self, hard, ace, composition):
+        """Distribution of the dealer's final total from a partial hand, as a list of 23 probabilities."""
+        key = (hard, ace, composition)
+        cached = self._dealer_cache.get(key)
+        if cached is not None:
+            return cached
+        value = hard + 10 if ace and hard <= 11 else hard
+        remaining = sum(composition)
+        probs = [0.0] * (DEALER_BUST + 1)
+        if value > 21:
+            probs[DEALER_BUST] = 1.0
+        elif value >= 17 or remaining == 0:
+            probs[value] = 1.0
+        else:
+            for i, count in enumerate(composition):
+                if count:
+                    p = count / remaining
+                    sub = self._dealer_outcomes(hard + i + 1, ace or i == 0, _without(composition, i))
+                    for j in range(DEALER_BUST + 1):
+                        probs[j] += p * sub[j]
+        self._dealer_cache[key] = probs
+        return probs
 
-        # --- Dealing Phase ---
-        # Deal two cards to each player and the dealer
-        for t in range(2):
-            # Deal to players in seat order
-            bot_turn = 0
-            for i in range(num_players):
-                # Find which player is in the current seat
-                if (self.player_sit - 1) == i:
-                    self.player.add_card(self.deck.deal_card())
-                elif bot_turn < len(self.bots):
-                    # This logic assumes bots fill the other seats in order
-                    self.bots[bot_turn].add_card(self.deck.deal_card())
-                    bot_turn = bot_turn + 1
+    def dealer_distribution(self, upcard, composition=None):
+        """
+        Returns the dealer's final-total distribution for an upcard.
+        Args:
+            upcard (Card): The dealer's face-up card.
+            composition (tuple, optional): Remaining shoe (see shoe_composition).
+                Defaults to a full shoe without the upcard.
+        Returns:
+            np.ndarray: 23 probabilities, index t for a final total t and DEALER_BUST for a bust.
+        """
+        if composition is None:
+            composition = shoe_composition(self.num_decks, [upcard])
+        points = upcard.points
+        return np.array(self._dealer_outcomes(points, points == 1, composition))
 
-            # Dealer gets one card face up, one face down
-            if t == 0:
-                self.dealer.add_card(self.deck.deal_card())
-            else:
-                hidden = self.deck.deal_card()
-                self.dealer.set_hidden_card(hidden)
+    def dealer_table(self, composition=None):
+        """
+        Dealer distributions for every upcard at once.
+        Returns:
+            np.ndarray: Shape (10, 23), row 0 for an ace upcard, rows 1-8 for 2-9, row 9 for tens.
+        """
+        table = np.zeros((10, DEALER_BUST + 1))
+        for i in range(10):
+            comp = composition if composition is not None else _without(shoe_composition(self.num_decks), i)
+            table[i] = self._dealer_outcomes(i + 1, i == 0, comp)
+        return table
 
-        # --- Show Initial Hands ---
-        bot_turn = 0
-        for i in range(num_players):
-            if (self.player_sit - 1) == i:
-                print(f'You got: {[str(card) for card in self.player.hand.cards]} (value: {self.player.hand.get_value()})')
-            else:
-                print(f'{self.bots[bot_turn].name} hand: {[str(card) for card in self.bots[bot_turn].hand.cards]} (value: {self.bots[bot_turn].hand.get_value()})')
-                bot_turn = bot_turn + 1
-        print(f'\nDealer shows: {self.dealer.hand.cards[0]}')
-        bot_turn = 0
-
-        # --- Player Turns ---
-        for i in range(num_players):
-            if (self.player_sit - 1) == i:
-                # Human player's turn
-                print()
-                while not self.player.has_bust():
-                    move = get_valid_choice('Do you want to \'hit\' or \'stand\'? ', ['hit', 'stand'])
-                    if move == 'hit':
-                        card = self.deck.deal_card()
-                        self.player.add_card(card)
-                        print(f'You drew: {card}')
-                        print(f'New hand: {[str(c) for c in self.player.hand.cards]} (value: {self.player.hand.get_value()})')
-                    else:
-                        if move == 'stand':
-                            break
-                        print('Invalid input. Please type \'hit\' or \'stand\'.')
-            else:
-                # Bots' turns
-                print(f'\n{self.bots[bot_turn].name}\'s turn:')
-                while not self.bots[bot_turn].has_bust() and self.bots[bot_turn].decide_move() == 'hit':
-                    card = self.deck.deal_card()
-                    self.bots[bot_turn].add_card(card)
-                    print(f'{self.bots[bot_turn].name} draws: {card}')
-                print(f'{self.bots[bot_turn].name} stands. Hand: {[str(c) for c in self.bots[bot_turn].hand.cards]} (value: {self.bots[bot_turn].hand.get_value()})')
-                bot_turn = bot_turn + 1
-
-        # --- Dealer's Turn ---
-        print(f'\nDealer reveals hidden card: {self.dealer.reveal_hidden_card()}')
-        print(f'Dealer\'s hand: {[str(card) for card in self.dealer.hand.cards]} (value: {self.dealer.hand.get_value()})')
-        while self.dealer.should_draw():
-            card = self.deck.deal_card()
-            self.dealer.add_card(card)
-            print(f'Dealer draws a: {card}')
-            print(f'Dealer now has: {[str(c) for c in self.dealer.hand.cards]} (value: {self.dealer.hand.get_value()})')
+    def _stand(self, hard, ace, up, composition):
+        """EV of standing on a hand against upcard index `up`."""
+        value = hard + 10 if ace and hard <= 11 else hard
+        if value > 21:
+            return -1.0
+        key = (value, up, composition)
+        cached = self._stand_cache.get(key)
+        if cached is not None:
+            return cached
+        dealer = self._dealer_outcomes(up + 1, up == 0, composition)
+        ev = dealer[DEALER_BUST]
+        for total in range(DEALER_BUST):
+            if dealer[total]:
+                if value > total:
+                    ev += dealer[total]
+                elif value < total:
+                    ev -= dealer[total]
+        self._stand_cache[key] = ev
+        return ev
 
-    def handle_bets(self):
-        """Collects bets from the human player and the bots."""
-        # Player's bet
-        amount = get_valid_int(f'{self.player.name}, enter your bet (1 - {self.player.chips}): ', 1, self.player.chips)
-        self.player.place_bet(amount)
-        print(self.player)
+    def _hit(self, hard, ace, up, composition):
+        """EV of taking one card and then playing optimally."""
+        key = (hard, ace, up, composition)
+        cached = self._hit_cache.get(key)
+        if cached is not None:
+            return cached
+        remaining = sum(composition)
+        ev = 0.0
+        for i, count in enumerate(composition):
+            if count:
+                new_hard = hard + i + 1
+                if new_hard > 21:
+                    ev -= count / remaining
+                    continue
+                new_ace = ace or i == 0
+                rest = _without(composition, i)
+                ev += count / remaining * max(self._stand(new_hard, new_ace, up, rest),
+                                              self._hit(new_hard, new_ace, up, rest))
+        self._hit_cache[key] = ev
+        return ev
 
-        # Bots' bets
-        for bot in self.bots:
-            # Rebuy logic for bots
-            if bot.chips == 0:
-                rebuy = bot.total_chips_added
-                bot.chips = rebuy
-                bot.total_chips_added = bot.total_chips_added + rebuy
-                print(f'{bot.name} was out of chips and added {rebuy} more chips.')
+    def stand_ev(self, hand, upcard, composition=None):
+        """Returns the exact expected value (per unit bet) of standing on `hand`."""
+        if composition is None:
+            composition = self.default_composition(hand, upcard)
+        return self._stand(hand.hard_total, hand.aces > 0, upcard.points - 1, composition)
 
-            amount = bot.place_random_bet()
-            bot.place_bet(amount)
-            print(f'{bot.name} bets {amount} chips and now has {bot.chips} chips.')
+    def hit_ev(self, hand, upcard, composition=None):
+        """Returns the exact expected value of hitting `hand` once and then playing optimally."""
+        if composition is None:
+            composition = self.default_composition(hand, upcard)
+        if hand.get_value() > 21:
+            return -1.0
+        return self._hit(hand.hard_total, hand.aces > 0, upcard.points - 1, composition)
 
-    def resolve_results(self):
-        """Determines the outcome for each player and settles bets."""
-        dealer_value = self.dealer.hand.get_value()
-        dealer_bust = dealer_value > 21
+    def best_move(self, hand, upcard, composition=None):
+        """
+        Returns the optimal move and its EV.
+        Returns:
+            tuple: ('hit' or 'stand', expected value per unit bet).
+        """
+        stand = self.stand_ev(hand, upcard, composition)
+        hit = self.hit_ev(hand, upcard, composition)
+        if hit > stand:
+            return 'hit', hit
+        return 'stand', stand
 
-        # Resolve player's outcome
-        player_value = self.player.hand.get_value()
-        print(f'\nYour final hand value: {player_value}')
-        if self.player.has_bust():
-            print('You busted and lost your bet.')
-        elif dealer_bust or player_value > dealer_value:
-            self.player.chips =  self.player.chips + (self.player.bet * 2)
-            print(f'You win! You now have {self.player.chips} chips.')
-        elif player_value == dealer_value:
-            self.player.chips = self.player.chips + self.player.bet
-            print(f'It\'s a tie. You get your bet back. Total chips: {self.player.chips}')
+    def evaluate_bot(self, bot, upcard, composition=None):
+        """
+        Compares a bot's decide_move() on its current hand with optimal play.
+        Returns:
+            tuple: (bot's move, optimal move, EV lost by the bot's move).
+        """
+        move = bot.decide_move(upcard)
+        best, best_ev = self.best_move(bot.hand, upcard, composition)
+        if move == 'hit':
+            ev = self.hit_ev(bot.hand, upcard, composition)
         else:
-            print('You lost this round.')
+            ev = self.stand_ev(bot.hand, upcard, composition)
+        return move, best, best_ev - ev
 
-        # Resolve bots' outcomes
-        for bot in self.bots:
-            bot_value = bot.hand.get_value()
-            result = ''
-            if bot.has_bust():
-                result = 'busted and lost.'
-            elif dealer_bust or bot_value > dealer_value:
-                bot.chips = bot.chips + (bot.bet * 2)
-                result = f'won and now has {bot.chips} chips.'
-            elif bot_value == dealer_value:
-                bot.chips = bot.chips + bot.bet
-                result = f'tied and got their bet back. Total: {bot.chips} chips.'
-            else:
-                result = 'lost this round.'
+# --- Strategy Tables ---
 
-            print(f'{bot.name} had {bot_value} → {result}')
+# Column order of strategy files: dealer upcards 2-10 then ace
+STRATEGY_COLUMNS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A']
+# Table values: 0 stand, 1 hit, 2 double (else hit), 3 surrender (else hit), and their file letters
+STRATEGY_MOVES = ('stand', 'hit', 'double', 'surrender')
+STRATEGY_LETTERS = 'SHDR'
 
-    def show_summary(self):
-        """Displays the final game summary and statistics."""
-        print('\n--- Game Summary ---')
-        all_players = [self.player] + self.bots
-        chip_counts = [p.chips for p in all_players]
-        chip_ratios = []
+class Strategy:
+    """
+    A hit/stand table for every (hard or soft total, dealer upcard) pair,
+    compiled into a flat array so a decision is a single lookup.
+    Index layout: ((soft * 22) + total) * 10 + upcard points - 1, value 1 for hit
+    (see STRATEGY_MOVES for doubles and surrenders). A second table marks the
+    pairs to split, indexed (pair card points - 1) * 10 + upcard points - 1.
+    Args:
+        name (str): Name of the strategy.
+        table (bytearray, optional): Compiled table. Defaults to the bots' hit-below-17 rule.
+    """
+    def __init__(self, name, table=None):
+        self.name = name
+        if table is None:
+            table = bytearray(2 * 22 * 10)
+            for soft in range(2):
+                for total in range(17):
+                    for up in range(10):
+                        table[(soft * 22 + total) * 10 + up] = 1
+        self.table = table
+        self.pairs = bytearray(10 * 10)
 
-        # Create a list of tuples with all data needed for ranking
-        for p in all_players:
-            initial = p.total_chips_added
-            ratio = f"{(p.chips / initial):.2f}"
-            chip_ratios.append((p.name, p.chips, initial, ratio))
-        names = [p.name for p in all_players]
-        avg = np.mean(chip_counts)
-        max_chips = np.max(chip_counts)
-        for name, chips in zip(names, chip_counts):
-            print(f'{name}: {chips} chips')
-        print(f'\nAverage chips: {avg:.2f}')
-        print(f'Highest chip count: {max_chips}')
-        print('\nPlayer ranking (highest to lowest):')
+    def decide(self, hand, dealer_card, options=None):
+        """
+        Returns the move for a hand that hasn't busted. Without `options` it is
+        'hit' or 'stand', doubles and surrenders counting as hits. With the list of
+        moves the rules allow, pairs are split when the pair table says so, and a
+        double or surrender that isn't allowed falls back to a hit.
+        """
+        up = dealer_card.points - 1
+        if options is not None and 'split' in options and self.pairs[(hand.cards[0].points - 1) * 10 + up]:
+            return 'split'
+        hard = hand.hard_total
+        if hand.aces and hard <= 11:
+            index = (32 + hard) * 10
+        else:
+            index = hard * 10
+        move = self.table[index + up]
+        if move < 2:
+            return 'hit' if move else 'stand'
+        move = STRATEGY_MOVES[move]
+        if options is not None and move in options:
+            return move
+        return 'hit'
 
-        # Sort players by their return on investment (ratio)
-        ranked = sorted(chip_ratios, key=lambda x: x[3], reverse=True)
-        for i, (name, chips, invested, ratio) in enumerate(ranked, 1):
-            print(f'{i}. {name} - Chips: {chips}, Invested: {invested}, Return Rate: {ratio}')
+    def set(self, soft, total, upcard_points, move):
+        """Sets one entry of the table (upcard_points is 1 for an ace)."""
+        self.table[(soft * 22 + total) * 10 + upcard_points - 1] = STRATEGY_MOVES.index(move)
 
-        # Prepare data for the table visualization
-        players_by_seat = {}
-        bot_index = 0
-        for seat in range(1, 4):
-            if seat == self.player_sit:
-                players_by_seat[seat] = self.player
-            else:
-                players_by_seat[seat] = self.bots[bot_index]
-                bot_index = bot_index + 1
-        ranked = sorted(
-            [
-                (
-                    p.name,
-                    p.chips,
-                    p.total_chips_added,
-                    p.chips / p.total_chips_added if p.total_chips_added else 0, p == self.player) for p in [self.player] + self.bots
-            ],
-            key=lambda x: x[3], reverse=True
-        )
-
-        # Generate and save the summary image
-        draw_table_by_seat_with_ranks(players_by_seat, self.player_sit, ranked)
-        print('Table image with seating and rankings saved as \'table_summary.png\'')
+    def get(self, soft, total, upcard_points):
+        """Returns the move stored for one entry of the table."""
+        return STRATEGY_MOVES[self.table[(soft * 22 + total) * 10 + upcard_points - 1]]
 
-if __name__ == '__main__':
-    # --- Game Setup ---
-    # This block runs when the script is executed directly.
-    # It collects initial information from the user to set up the game.
-    name = input('Enter your name: ')
-    initial_chips = get_valid_int('Enter the amount of chips: ', min_val=100, max_val=1000)
-    sit = get_valid_int('Where would you like to sit? (Choose a seat number from 1 to 3): ', min_val=1, max_val=3)
+    def set_pair(self, pair_points, upcard_points, split):
+        """Sets whether a pair (pair_points is 1 for aces) is split against an upcard."""
+        self.pairs[(pair_points - 1) * 10 + upcard_points - 1] = 1 if split else 0
 
-    # Instantiate the main game controller
-    game = GameManager(name, initial_chips, sit, deck_seed=0)
+    def get_pair(self, pair_points, upcard_points):
+        """Returns whether a pair is split against an upcard."""
+        return bool(self.pairs[(pair_points - 1) * 10 + upcard_points - 1])
 
-    # Load bot players from an external file
-    game.load_players_from_file('bots.txt')
+    @classmethod
+    def load(cls, filepath):
+        """
+        Reads a strategy file: lines like 'hard 12 HHSSSHHHHH' or 'soft 18 DDDDDSSHHH',
+        one letter per dealer upcard from 2 to ace: H hit, S stand, D double (else hit)
+        or R surrender (else hit). Lines like 'pair 8 PPPPPPPPPP' mark splits (P) per
+        upcard, with 'pair A' for aces. Missing rows keep the hit-below-17 rule and no splits.
+        Raises:
+            ValueError: If a line is malformed.
+        """
+        strategy = cls(os.path.splitext(os.path.basename(filepath))[0])
+        with open(filepath, 'r') as file:
+            for number, line in enumerate(file, 1):
+                line = line.split('#')[0].strip()
+                if not line:
+                    continue
+                parts = line.split()
+                if len(parts) == 3 and parts[0] == 'pair' and parts[1] in RANK_POINTS and len(parts[2]) == 10 \
+                        and all(c in 'PN' for c in parts[2].upper()):
+                    for column, letter in zip(STRATEGY_COLUMNS, parts[2].upper()):
+                        strategy.set_pair(RANK_POINTS[parts[1]], RANK_POINTS[column], letter == 'P')
+                    continue
+                if (len(parts) != 3 or parts[0] not in ('hard', 'soft') or not parts[1].isdigit()
+                        or not 0 <= int(parts[1]) <= 21 or len(parts[2]) != 10
+                        or any(c not in STRATEGY_LETTERS for c in parts[2].upper())):
+                    raise ValueError(f'{filepath}:{number}: invalid strategy line: {line!r}')
+                soft = parts[0] == 'soft'
+                for column, letter in zip(STRATEGY_COLUMNS, parts[2].upper()):
+                    strategy.set(soft, int(parts[1]), RANK_POINTS[column], STRATEGY_MOVES[STRATEGY_LETTERS.index(letter)])
+        return strategy
+
+    def save(self, filepath):
+        """Writes the table in the format read by Strategy.load()."""
+        with open(filepath, 'w') as file:
+            file.write(f'# {self.name}: hit (H) or stand (S) per dealer upcard {" ".join(STRATEGY_COLUMNS)}\n')
+            for soft, totals in ((False, range(4, 22)), (True, range(12, 22))):
+                for total in totals:
+                    letters = ''.join(STRATEGY_LETTERS[STRATEGY_MOVES.index(self.get(soft, total, RANK_POINTS[c]))]
+                                      for c in STRATEGY_COLUMNS)
+                    file.write(f'{"soft" if soft else "hard"} {total} {letters}\n')
+            # Pair rows only when the table splits anything, so hit/stand files stay unchanged
+            if any(self.pairs):
+                for rank in STRATEGY_COLUMNS:
+                    letters = ''.join('P' if self.get_pair(RANK_POINTS[rank], RANK_POINTS[c]) else 'N'
+                                      for c in STRATEGY_COLUMNS)
+                    file.write(f'pair {rank} {letters}\n')
+
+# Compiled strategies by file path, so bots sharing a file share one table
+_strategy_cache = {}
+
+def load_strategy(filepath):
+    """Loads a strategy file once and returns the shared compiled Strategy."""
+    if filepath not in _strategy_cache:
+        _strategy_cache[filepath] = Strategy.load(filepath)
+    return _strategy_cache[filepath]
+
+def _representative_hand(soft, total):
+    """Builds a Hand with the given total, used by the solver to query ExactEV."""
+    hand = Hand()
+    if soft:
+        ranks = ['A', 'A'] if total == 12 else ['A', STRATEGY_COLUMNS[total - 13]]
+    elif total <= 11:
+        ranks = ['2', str(total - 2)]
+    elif total <= 20:
+        ranks = ['10', str(total - 10)]
+    else:
+        ranks = ['10', '9', '2']
+    for rank in ranks:
+        hand.add_card(Card('♠', rank))
+    return hand
+
+def solve_strategy(num_decks=1, name='optimal'):
+    """
+    Generates the optimal hit/stand table for the table's rules from exact EVs.
+    Args:
+        num_decks (int): Number of decks in the shoe.
+        name (str): Name given to the strategy.
+    Returns:
+        Strategy: The solved table (save it with Strategy.save()).
+    """
+    engine = ExactEV(num_decks)
+    strategy = Strategy(name)
+    for soft, totals in ((False, range(4, 22)), (True, range(12, 22))):
+        for total in totals:
+            hand = _representative_hand(soft, total)
+            for column in STRATEGY_COLUMNS:
+                move, _ = engine.best_move(hand, Card('♠', column))
+                strategy.set(soft, total, RANK_POINTS[column], move)
+    return strategy
+
+# --- Table Rules ---
+
+class Rules:
+    """
+    The rule set of a table. The defaults are the game's classic table: the dealer
+    stands on soft 17, a two-card 21 is an ordinary 21 paid 1:1 and players can
+    only hit or stand.
+    Args:
+        hit_soft_17 (bool): The dealer hits soft 17 (H17) instead of standing (S17).
+        blackjack_pays (tuple, optional): Payout of a natural, e.g. (3, 2) or (6, 5).
+            When set, naturals count: the dealer peeks under an ace or ten, a natural
+            beats any other 21 and two naturals push. None keeps the classic rule.
+        double (bool): Players may double down on their first two cards.
+        double_after_split (bool): Doubling is also allowed on split hands.
+        max_splits (int): Splits allowed per seat (3 allows four hands); 0 disables splitting.
+        resplit_aces (bool): Split aces may be split again.
+        hit_split_aces (bool): Split aces may draw more than one card each.
+        surrender (bool): Late surrender of the first two cards for half the bet.
+        insurance (bool): Insurance paying 2:1 is offered under a dealer ace (needs blackjack_pays).
+    Raises:
+        ValueError: If the options contradict each other.
+    """
+    def __init__(self, hit_soft_17=False, blackjack_pays=None, double=False, double_after_split=False,
+                 max_splits=0, resplit_aces=False, hit_split_aces=False, surrender=False, insurance=False):
+        if insurance and blackjack_pays is None:
+            raise ValueError('Insurance needs naturals: set blackjack_pays.')
+        if double_after_split and not double:
+            raise ValueError('double_after_split needs double.')
+        if max_splits < 0:
+            raise ValueError('max_splits cannot be negative.')
+        self.hit_soft_17 = hit_soft_17
+        self.blackjack_pays = blackjack_pays
+        self.double = double
+        self.double_after_split = double_after_split
+        self.max_splits = max_splits
+        self.resplit_aces = resplit_aces
+        self.hit_split_aces = hit_split_aces
+        self.surrender = surrender
+        self.insurance = insurance
+
+    @classmethod
+    def casino(cls, blackjack_pays=(3, 2), hit_soft_17=False):
+        """A common casino table: naturals pay 3:2, double on any two cards, DAS, up to 3 splits, insurance."""
+        return cls(hit_soft_17=hit_soft_17, blackjack_pays=blackjack_pays, double=True,
+                   double_after_split=True, max_splits=3, insurance=True)
+
+    @property
+    def hit_stand_only(self):
+        """True for the classic game: only hit or stand, and naturals are ordinary hands."""
+        return not (self.blackjack_pays or self.double or self.max_splits or self.surrender)
+
+    def __repr__(self):
+        return 'Rules(' + ', '.join(f'{k}={v!r}' for k, v in vars(self).items()) + ')'
+
+# --- Bet Sizing ---
+
+class BetSizer:
+    """
+    Sizes a seat's bets within the table limits. Subclasses give the wanted stake
+    through stake(); bet() sizes one seat and bets() a whole array of bankrolls at
+    once (see risk_of_ruin). A bet is whole chips, at least `min_bet`, at most
+    `max_bet` and never more than the chips left.
+    Args:
+        min_bet (int): Table minimum.
+        max_bet (int, optional): Table maximum. None for no limit.
+    Raises:
+        ValueError: If the limits are inconsistent.
+    """
+    # True when the stake depends on the true count, i.e. the table must track its shoe
+    needs_count = False
+
+    def __init__(self, min_bet=1, max_bet=None):
+        if min_bet < 1:
+            raise ValueError('min_bet must be at least 1.')
+        if max_bet is not None and max_bet < min_bet:
+            raise ValueError('max_bet cannot be below min_bet.')
+        self.min_bet = min_bet
+        self.max_bet = max_bet
+
+    def stake(self, chips, true_count):
+        """
+        Returns the wanted stake before the limits are applied. Works elementwise
+        on NumPy arrays as well as on plain numbers.
+        """
+        raise NotImplementedError
+
+    def bet(self, chips, true_count=0.0, rng=None):
+        """
+        Returns the bet of a seat holding `chips` (at least 1).
+        Args:
+            chips (int): The seat's chips.
+            true_count (float): The Hi-Lo true count, 0 when the shoe isn't tracked.
+            rng (random.Random, optional): The seat's generator, for random sizers.
+        """
+        amount = max(int(self.stake(chips, true_count)), self.min_bet)
+        if self.max_bet is not None and amount > self.max_bet:
+            amount = self.max_bet
+        return min(amount, chips)
+
+    def bets(self, chips, true_counts, rng):
+        """
+        Vectorized bet(): the bets of many bankrolls at once.
+        Args:
+            chips (np.ndarray): Bankrolls.
+            true_counts (np.ndarray or float): The true count of each bankroll's round.
+            rng (np.random.Generator): Generator for random sizers.
+        Returns:
+            np.ndarray: The bets, as floats.
+        """
+        stakes = np.asarray(self.stake(chips, true_counts), dtype=np.float64)
+        amounts = np.floor(np.broadcast_to(stakes, np.shape(chips)))
+        np.maximum(amounts, self.min_bet, out=amounts)
+        if self.max_bet is not None:
+            np.minimum(amounts, self.max_bet, out=amounts)
+        return np.minimum(amounts, chips, out=amounts)
+
+    def __repr__(self):
+        return (f'{type(self).__name__}('
+                + ', '.join(f'{k}={v!r}' for k, v in vars(self).items() if not k.startswith('_')) + ')')
+
+class RandomBet(BetSizer):
+    """
+    The classic bot bet: uniform between the table minimum and all chips (or the table maximum).
+    Args:
+        seed (int, optional): Seed of the generator used when bet() gets no `rng`.
+    """
+    def __init__(self, min_bet=1, max_bet=None, seed=None):
+        super().__init__(min_bet, max_bet)
+        self._rng = random.Random(seed)
+
+    def bet(self, chips, true_count=0.0, rng=None):
+        """Draws the bet with `rng`, the seat's generator, so bots keep their classic bets."""
+        top = chips if self.max_bet is None else min(chips, self.max_bet)
+        if top < self.min_bet:
+            return top
+        return (rng or self._rng).randint(self.min_bet, top)
+
+    def bets(self, chips, true_counts, rng):
+        top = chips if self.max_bet is None else np.minimum(chips, self.max_bet)
+        low = np.minimum(self.min_bet, top)
+        return np.floor(low + rng.random(np.shape(chips)) * (np.floor(top) - low + 1))
+
+class FlatBet(BetSizer):
+    """
+    Always the same bet.
+    Args:
+        amount (int): The bet.
+    """
+    def __init__(self, amount, min_bet=1, max_bet=None):
+        super().__init__(min_bet, max_bet)
+        self.amount = amount
+
+    def stake(self, chips, true_count):
+        return self.amount
+
+class ProportionalBet(BetSizer):
+    """
+    A fixed fraction of the current chips, e.g. the Kelly fraction (see kelly()).
+    Args:
+        fraction (float): Fraction of the chips wagered each round.
+    """
+    def __init__(self, fraction, min_bet=1, max_bet=None):
+        super().__init__(min_bet, max_bet)
+        if not 0 <= fraction <= 1:
+            raise ValueError('fraction must be between 0 and 1.')
+        self.fraction = fraction
+
+    @classmethod
+    def kelly(cls, edge, variance, multiplier=1.0, min_bet=1, max_bet=None):
+        """
+        The Kelly bet fraction edge / variance, scaled by `multiplier` (0.5 for half
+        Kelly). A seat without an edge bets the table minimum.
+        Args:
+            edge (float): Expected return per unit bet, e.g. SeatStats.mean.
+            variance (float): Variance of the return per unit bet, e.g. SeatStats.variance.
+        """
+        fraction = multiplier * edge / variance if edge > 0 and variance > 0 else 0.0
+        return cls(min(fraction, 1.0), min_bet, max_bet)
+
+    def stake(self, chips, true_count):
+        return chips * self.fraction
+
+class CountSpread(BetSizer):
+    """
+    A bet ramp on the Hi-Lo true count: `unit` chips times the units of the highest
+    threshold the count has reached, one unit below all of them.
+    Args:
+        unit (int): Chips per betting unit.
+        ramp (dict): {true count threshold: units}, e.g. {1: 2, 2: 4, 3: 8}.
+    """
+    needs_count = True
+
+    def __init__(self, unit, ramp, min_bet=1, max_bet=None):
+        super().__init__(min_bet, max_bet)
+        self.unit = unit
+        self.ramp = dict(sorted(ramp.items()))
+        self._thresholds = list(self.ramp)
+        self._units = np.array([1] + list(self.ramp.values()), dtype=np.float64)
+
+    def stake(self, chips, true_count):
+        if isinstance(true_count, np.ndarray):
+            return self.unit * self._units[np.searchsorted(self._thresholds, true_count, side='right')]
+        return self.unit * self._units[bisect.bisect_right(self._thresholds, true_count)]
+
+class RebuyPolicy:
+    """Decides how many chips a seat buys after going broke."""
+    def amount(self, player):
+        """Returns the chips `player` buys (player.total_chips_added is what they bought so far)."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f'{type(self).__name__}(' + ', '.join(f'{k}={v!r}' for k, v in vars(self).items()) + ')'
+
+class DoublingRebuy(RebuyPolicy):
+    """
+    The classic bot rebuy: as many chips as bought so far, doubling the investment
+    each time. `cap` bounds a single rebuy so long runs can't blow the stack up.
+    Args:
+        cap (int, optional): Largest single rebuy. None for no limit.
+    """
+    def __init__(self, cap=None):
+        self.cap = cap
+
+    def amount(self, player):
+        if self.cap is None:
+            return player.total_chips_added
+        return min(player.total_chips_added, self.cap)
+
+class FixedRebuy(RebuyPolicy):
+    """
+    The same stack on every rebuy.
+    Args:
+        stack (int): Chips bought.
+    """
+    def __init__(self, stack):
+        if stack < 1:
+            raise ValueError('stack must be at least 1.')
+        self.stack = stack
+
+    def amount(self, player):
+        return self.stack
+
+# --- Round Event Log ---
+
+# Event types of the round log
+EVENT_DEAL, EVENT_HIT, EVENT_STAND, EVENT_BET, EVENT_PAYOUT, EVENT_REBUY = range(6)
+EVENT_DOUBLE, EVENT_SPLIT, EVENT_SURRENDER, EVENT_INSURANCE = range(6, 10)
+EVENT_NAMES = ['deal', 'hit', 'stand', 'bet', 'payout', 'rebuy', 'double', 'split', 'surrender', 'insurance']
+DEALER_SEAT = 255  # Seat number used for the dealer's events
+
+# Fixed-width 16 byte records: round, event, seat, card code, hand total after the event, chip amount
+EVENT_STRUCT = struct.Struct('<IBBBBd')
+EVENT_DTYPE = np.dtype([('round', '<u4'), ('event', 'u1'), ('seat', 'u1'),
+                        ('card', 'u1'), ('total', 'u1'), ('amount', '<f8')])
+LOG_MAGIC = b'BJEVLOG1'
+LOG_HEADER = struct.Struct('<8sII')  # magic, record size, reserved
+
+class RoundLogWriter:
+    """
+    Buffered, append-only writer of round events in a fixed-width binary format.
+    Events are packed into a preallocated buffer and written in large blocks, so
+    logging costs a struct.pack_into per event. Reopening an existing log appends
+    to it and continues its round numbering.
+    Args:
+        filepath (str): Path of the log file.
+        buffer_events (int): Number of events buffered between writes.
+    """
+    def __init__(self, filepath, buffer_events=65536):
+        self.filepath = filepath
+        self.round = 0
+        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+            self._file = open(filepath, 'r+b')
+            count = _check_log_header(self._file, filepath)
+            # Drop a partial record left by an interrupted write
+            self._file.truncate(LOG_HEADER.size + count * EVENT_STRUCT.size)
+            if count:
+                self._file.seek(LOG_HEADER.size + (count - 1) * EVENT_STRUCT.size)
+                self.round = EVENT_STRUCT.unpack(self._file.read(EVENT_STRUCT.size))[0] + 1
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(filepath, 'wb')
+            self._file.write(LOG_HEADER.pack(LOG_MAGIC, EVENT_STRUCT.size, 0))
+        self._buffer = bytearray(EVENT_STRUCT.size * buffer_events)
+        self._offset = 0
+
+    def record(self, event, seat, card=NO_CARD, total=0, amount=0):
+        """Appends one event to the current round."""
+        if self._offset == len(self._buffer):
+            self.flush()
+        EVENT_STRUCT.pack_into(self._buffer, self._offset, self.round, event, seat, card, total, to_float(amount))
+        self._offset += EVENT_STRUCT.size
+
+    def end_round(self):
+        """Moves on to the next round number."""
+        self.round += 1
+
+    def flush(self):
+        """Writes the buffered events to the file."""
+        if self._offset:
+            self._file.write(memoryview(self._buffer)[:self._offset])
+            self._offset = 0
+        self._file.flush()
+
+    def close(self):
+        """Flushes and closes the log."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _check_log_header(file, filepath):
+    """Validates a log header and returns the number of complete records in the file."""
+    file.seek(0)
+    header = file.read(LOG_HEADER.size)
+    if len(header) < LOG_HEADER.size:
+        raise ValueError(f'{filepath} is not a round log.')
+    magic, record_size, _ = LOG_HEADER.unpack(header)
+    if magic != LOG_MAGIC or record_size != EVENT_STRUCT.size:
+        raise ValueError(f'{filepath} is not a round log.')
+    return (os.path.getsize(filepath) - LOG_HEADER.size) // EVENT_STRUCT.size
+
+def read_round_log(filepath):
+    """
+    Memory-maps a round log for analysis without loading it.
+    Returns:
+        np.ndarray: Read-only structured array with EVENT_DTYPE fields
+            (round, event, seat, card, total, amount).
+    """
+    with open(filepath, 'rb') as file:
+        count = _check_log_header(file, filepath)
+    if count == 0:
+        return np.zeros(0, dtype=EVENT_DTYPE)
+    return np.memmap(filepath, dtype=EVENT_DTYPE, mode='r', offset=LOG_HEADER.size, shape=(count,))
+
+# --- Output Sinks ---
+
+class NullSink:
+    """
+    Receives the events of a round from GameManager and ignores them.
+    It is also the base class of the other sinks: every hook is a no-op, so a
+    sink only overrides what it needs. Seats are 0-based, DEALER_SEAT for the dealer.
+    """
+    def dealing_start(self):
+        """Called before the first card of a round is dealt."""
+
+    def rebuy(self, seat, player, amount):
+        """A player bought `amount` chips after running out."""
+
+    def bet(self, seat, player, amount):
+        """A player placed a bet."""
+
+    def deal(self, seat, player, card):
+        """A card was dealt to a player or the dealer during the initial deal."""
+
+    def show_hand(self, seat, player):
+        """A player's starting hand is shown to the table."""
+
+    def dealer_shows(self, card):
+        """The dealer's upcard is shown."""
+
+    def turn_start(self, seat, player):
+        """A player's turn begins."""
+
+    def hit(self, seat, player, card):
+        """A player or the dealer drew a card."""
+
+    def turn_end(self, seat, player):
+        """A player's or the dealer's turn is over (stood or busted)."""
+
+    def dealer_reveal(self, dealer):
+        """The dealer turned over the hidden card."""
+
+    def insurance(self, seat, player, amount):
+        """A player took insurance for `amount` chips."""
+
+    def dealer_peek(self, has_blackjack):
+        """The dealer checked the hole card for a natural."""
+
+    def double(self, seat, player):
+        """A player doubled their bet; the one card they draw follows as a hit."""
+
+    def split(self, seat, player):
+        """A player split a pair; the split-off hand is player.splits[-1][0]."""
+
+    def hand_start(self, seat, player, number):
+        """Play moves to a player's split hand `number` (from 2), now player.hand."""
+
+    def surrender(self, seat, player):
+        """A player surrendered half their bet."""
+
+    def insurance_result(self, seat, player, payout):
+        """A player's insurance bet was settled."""
+
+    def result(self, seat, player, value, outcome, payout):
+        """A player's bet was settled; outcome is 'bust', 'win', 'tie' or 'lose'."""
+
+    def round_end(self):
+        """All bets of the round are settled."""
+
+class ConsoleRenderer(NullSink):
+    """
+    Prints the round to the console exactly as the interactive game always has.
+    Args:
+        you (Player, optional): The human addressed as "You". Other humans at the
+            table are announced by name like the bots; by default every human is "You".
+    """
+    def __init__(self, you=None):
+        self.you = you
+
+    def _by_name(self, player):
+        """True for players announced by name: bots and the humans other than `you`."""
+        if isinstance(player, BotPlayer):
+            return True
+        return self.you is not None and player is not self.you and not isinstance(player, Dealer)
+
+    def dealing_start(self):
+        print()
+
+    def rebuy(self, seat, player, amount):
+        if self._by_name(player):
+            print(f'{player.name} was out of chips and added {amount} more chips.')
+
+    def bet(self, seat, player, amount):
+        if self._by_name(player):
+            print(f'{player.name} bets {amount} chips and now has {player.chips} chips.')
+        else:
+            print(player)
+
+    def show_hand(self, seat, player):
+        if self._by_name(player):
+            print(f'{player.name} hand: {[str(card) for card in player.hand.cards]} (value: {player.hand.get_value()})')
+        else:
+            print(f'You got: {[str(card) for card in player.hand.cards]} (value: {player.hand.get_value()})')
+
+    def dealer_shows(self, card):
+        print(f'\nDealer shows: {card}')
+
+    def turn_start(self, seat, player):
+        if self._by_name(player):
+            print(f'\n{player.name}\'s turn:')
+        elif not isinstance(player, Dealer):
+            print()
+
+    def hit(self, seat, player, card):
+        if isinstance(player, Dealer):
+            print(f'Dealer draws a: {card}')
+            print(f'Dealer now has: {[str(c) for c in player.hand.cards]} (value: {player.hand.get_value()})')
+        elif self._by_name(player):
+            print(f'{player.name} draws: {card}')
+        else:
+            print(f'You drew: {card}')
+            print(f'New hand: {[str(c) for c in player.hand.cards]} (value: {player.hand.get_value()})')
+
+    def turn_end(self, seat, player):
+        if self._by_name(player) and not player.surrendered:
+            print(f'{player.name} stands. Hand: {[str(c) for c in player.hand.cards]} (value: {player.hand.get_value()})')
+
+    def insurance(self, seat, player, amount):
+        if self._by_name(player):
+            print(f'{player.name} takes insurance for {amount} chips.')
+        else:
+            print(f'You take insurance for {amount} chips.')
+
+    def dealer_peek(self, has_blackjack):
+        if has_blackjack:
+            print('\nDealer has blackjack!')
+
+    def double(self, seat, player):
+        if self._by_name(player):
+            print(f'{player.name} doubles down to {player.bet} chips.')
+        else:
+            print(f'You double down to {player.bet} chips.')
+
+    def split(self, seat, player):
+        if self._by_name(player):
+            print(f'{player.name} splits their pair.')
+        else:
+            print('You split your pair.')
+
+    def hand_start(self, seat, player, number):
+        cards = [str(c) for c in player.hand.cards]
+        if self._by_name(player):
+            print(f'{player.name} plays hand {number}: {cards}')
+        else:
+            print(f'\nYour hand {number}: {cards} (value: {player.hand.get_value()})')
+
+    def surrender(self, seat, player):
+        if self._by_name(player):
+            print(f'{player.name} surrenders.')
+        else:
+            print('You surrender and get half your bet back.')
+
+    def insurance_result(self, seat, player, payout):
+        owner = f'{player.name}\'s' if self._by_name(player) else 'Your'
+        if payout:
+            print(f'{owner} insurance pays {payout} chips.')
+        else:
+            print(f'{owner} insurance is lost.')
+
+    def dealer_reveal(self, dealer):
+        print(f'\nDealer reveals hidden card: {dealer.reveal_hidden_card()}')
+        print(f'Dealer\'s hand: {[str(card) for card in dealer.hand.cards]} (value: {dealer.hand.get_value()})')
+
+    def result(self, seat, player, value, outcome, payout):
+        if self._by_name(player):
+            if outcome == 'bust':
+                text = 'busted and lost.'
+            elif outcome == 'blackjack':
+                text = f'has blackjack and now has {player.chips} chips.'
+            elif outcome == 'surrender':
+                text = 'surrendered half the bet.'
+            elif outcome == 'win':
+                text = f'won and now has {player.chips} chips.'
+            elif outcome == 'tie':
+                text = f'tied and got their bet back. Total: {player.chips} chips.'
+            else:
+                text = 'lost this round.'
+            print(f'{player.name} had {value} → {text}')
+        else:
+            print(f'\nYour final hand value: {value}')
+            if outcome == 'bust':
+                print('You busted and lost your bet.')
+            elif outcome == 'blackjack':
+                print(f'Blackjack! You now have {player.chips} chips.')
+            elif outcome == 'surrender':
+                print('You surrendered half your bet.')
+            elif outcome == 'win':
+                print(f'You win! You now have {player.chips} chips.')
+            elif outcome == 'tie':
+                print(f'It\'s a tie. You get your bet back. Total chips: {player.chips}')
+            else:
+                print('You lost this round.')
+
+class EventSink(NullSink):
+    """Writes the round as structured events to a RoundLogWriter."""
+    def __init__(self, writer):
+        self.writer = writer
+
+    def rebuy(self, seat, player, amount):
+        self.writer.record(EVENT_REBUY, seat, amount=amount)
+
+    def bet(self, seat, player, amount):
+        self.writer.record(EVENT_BET, seat, amount=amount)
+
+    def deal(self, seat, player, card):
+        self.writer.record(EVENT_DEAL, seat, card_code(card), player.hand.get_value())
+
+    def hit(self, seat, player, card):
+        self.writer.record(EVENT_HIT, seat, card_code(card), player.hand.get_value())
+
+    def turn_end(self, seat, player):
+        value = player.hand.get_value()
+        if value <= 21:
+            self.writer.record(EVENT_STAND, seat, total=value)
+
+    def insurance(self, seat, player, amount):
+        self.writer.record(EVENT_INSURANCE, seat, amount=amount)
+
+    def double(self, seat, player):
+        self.writer.record(EVENT_DOUBLE, seat, total=player.hand.get_value(), amount=player.bet)
+
+    def split(self, seat, player):
+        self.writer.record(EVENT_SPLIT, seat, amount=player.splits[-1][1])
+
+    def surrender(self, seat, player):
+        self.writer.record(EVENT_SURRENDER, seat, total=player.hand.get_value())
+
+    def result(self, seat, player, value, outcome, payout):
+        self.writer.record(EVENT_PAYOUT, seat, total=value, amount=payout)
+
+    def round_end(self):
+        self.writer.end_round()
+
+class TeeSink(NullSink):
+    """Forwards every event to several sinks, e.g. the console and an event log."""
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def _forward(self, hook, args):
+        for sink in self.sinks:
+            getattr(sink, hook)(*args)
+
+    def dealing_start(self, *args):
+        self._forward('dealing_start', args)
+
+    def rebuy(self, *args):
+        self._forward('rebuy', args)
+
+    def bet(self, *args):
+        self._forward('bet', args)
+
+    def deal(self, *args):
+        self._forward('deal', args)
+
+    def show_hand(self, *args):
+        self._forward('show_hand', args)
+
+    def dealer_shows(self, *args):
+        self._forward('dealer_shows', args)
+
+    def turn_start(self, *args):
+        self._forward('turn_start', args)
+
+    def hit(self, *args):
+        self._forward('hit', args)
+
+    def turn_end(self, *args):
+        self._forward('turn_end', args)
+
+    def dealer_reveal(self, *args):
+        self._forward('dealer_reveal', args)
+
+    def insurance(self, *args):
+        self._forward('insurance', args)
+
+    def dealer_peek(self, *args):
+        self._forward('dealer_peek', args)
+
+    def double(self, *args):
+        self._forward('double', args)
+
+    def split(self, *args):
+        self._forward('split', args)
+
+    def hand_start(self, *args):
+        self._forward('hand_start', args)
+
+    def surrender(self, *args):
+        self._forward('surrender', args)
+
+    def insurance_result(self, *args):
+        self._forward('insurance_result', args)
+
+    def result(self, *args):
+        self._forward('result', args)
+
+    def round_end(self, *args):
+        self._forward('round_end', args)
+
+# --- Headless Simulation ---
+
+class SeatPolicy:
+    """
+    Decision policy for the human seat when the game runs without input().
+    The default bets a flat amount and hits below 17, like the bots do.
+    Args:
+        bet (int): The flat bet, when no `betting` is given.
+        stand_on (int): Hit below this total, when no `strategy` is given.
+        rebuy (int or RebuyPolicy, optional): Chips bought when broke. Defaults to the starting stack.
+        strategy (Strategy, optional): Decisions by hand and dealer upcard.
+        betting (BetSizer, optional): Sizes the bets instead of the flat `bet`.
+    """
+    def __init__(self, bet=10, stand_on=17, rebuy=None, strategy=None, betting=None):
+        self.bet = bet
+        self.stand_on = stand_on
+        self.rebuy = rebuy
+        self.strategy = strategy
+        self.betting = betting
+
+    def place_bet(self, player, true_count=0.0):
+        """Returns the amount the seat wagers this round."""
+        if self.betting is not None:
+            return self.betting.bet(player.chips, true_count)
+        return min(self.bet, player.chips)
+
+    def decide_move(self, hand, dealer_card, options=None):
+        """Returns 'hit' or 'stand' (or an allowed move from `options`, see Strategy.decide)."""
+        if self.strategy is not None:
+            return self.strategy.decide(hand, dealer_card, options)
+        if hand.get_value() < self.stand_on:
+            return 'hit'
+        return 'stand'
+
+    def wants_insurance(self, player):
+        """The policy never takes insurance, a losing bet without counting."""
+        return False
+
+    def rebuy_amount(self, player, initial_chips):
+        """Returns how many chips the seat buys when it runs out (defaults to the starting stack)."""
+        if self.rebuy is None:
+            return initial_chips
+        if isinstance(self.rebuy, RebuyPolicy):
+            return self.rebuy.amount(player)
+        return self.rebuy
+
+def to_float(value):
+    """
+    Converts a chip amount to float, saturating at +/-inf.
+    Bot rebuys double without limit, so a bot's stack can outgrow a float in long runs.
+    """
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf if value > 0 else -math.inf
+
+# Histogram of per-round returns in units of the bet: bins of RETURN_STEP from RETURN_MIN to RETURN_MAX
+RETURN_MIN = -4.0
+RETURN_MAX = 4.0
+RETURN_STEP = 0.5
+RETURN_BINS = int((RETURN_MAX - RETURN_MIN) / RETURN_STEP) + 1
+
+class SeatStats:
+    """
+    Aggregated results of a single seat over a headless simulation.
+    Besides the counters it keeps a Welford mean/variance and a histogram of the
+    per-round return per unit bet, so stats from several workers can be merged.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.rounds = 0
+        self.wagered = 0
+        self.net = 0
+        self.busts = 0
+        self.wins = 0
+        self.ties = 0
+        self.losses = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.hist = [0] * RETURN_BINS
+        # Rounds and summed return per unit bet by rounded true count, while the shoe is tracked
+        self.by_count = {}
+
+    def record(self, bet, net, busted, count=None):
+        """
+        Adds the outcome of one round (net is the chip change including the bet),
+        bucketed by `count`, the rounded true count before the round, when given.
+        """
+        self.rounds += 1
+        self.wagered += bet
+        self.net += net
+        if busted:
+            self.busts += 1
+        if net > 0:
+            self.wins += 1
+        elif net == 0:
+            self.ties += 1
+        else:
+            self.losses += 1
+
+        # Welford update on the return per unit bet
+        ret = net / bet if bet else 0.0
+        delta = ret - self.mean
+        self.mean += delta / self.rounds
+        self.m2 += delta * (ret - self.mean)
+        b = int((ret - RETURN_MIN) / RETURN_STEP + 0.5)
+        self.hist[min(max(b, 0), RETURN_BINS - 1)] += 1
+        if count is not None:
+            bucket = self.by_count.get(count)
+            if bucket is None:
+                bucket = self.by_count[count] = [0, 0.0]
+            bucket[0] += 1
+            bucket[1] += ret
+
+    def merge(self, other):
+        """Folds another seat's statistics into this one (Chan's parallel variance formula)."""
+        n = self.rounds + other.rounds
+        if other.rounds:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.rounds * other.rounds / n
+            self.mean += delta * other.rounds / n
+        self.rounds = n
+        self.wagered += other.wagered
+        self.net += other.net
+        self.busts += other.busts
+        self.wins += other.wins
+        self.ties += other.ties
+        self.losses += other.losses
+        self.hist = [x + y for x, y in zip(self.hist, other.hist)]
+        for count, (rounds, total) in other.by_count.items():
+            bucket = self.by_count.setdefault(count, [0, 0.0])
+            bucket[0] += rounds
+            bucket[1] += total
+
+    @property
+    def ev(self):
+        """Average chips won or lost per round."""
+        return to_float(self.net) / self.rounds if self.rounds else 0.0
+
+    @property
+    def ev_per_unit(self):
+        """Average return per chip wagered."""
+        return self.net / self.wagered if self.wagered else 0.0
+
+    @property
+    def bust_rate(self):
+        """Fraction of rounds in which the seat busted."""
+        return self.busts / self.rounds if self.rounds else 0.0
+
+    @property
+    def variance(self):
+        """Sample variance of the per-round return per unit bet."""
+        return self.m2 / (self.rounds - 1) if self.rounds > 1 else 0.0
+
+    @property
+    def std_error(self):
+        """Standard error of the mean per-round return per unit bet."""
+        return math.sqrt(self.variance / self.rounds) if self.rounds else 0.0
+
+    def ev_by_count(self):
+        """Returns {true count: (rounds, mean return per unit bet)} in count order."""
+        return {count: (rounds, total / rounds) for count, (rounds, total) in sorted(self.by_count.items())}
+
+    @property
+    def histogram(self):
+        """Returns (counts, bin_centers) of the per-round return per unit bet."""
+        centers = RETURN_MIN + RETURN_STEP * np.arange(RETURN_BINS)
+        return np.array(self.hist, dtype=np.int64), centers
+
+    def __str__(self):
+        return (f'{self.name}: EV {self.ev:+.4f}/round ({self.ev_per_unit:+.4f}/chip), '
+                f'mean return {self.mean:+.4f} ± {self.std_error:.4f}, '
+                f'bust rate {self.bust_rate:.2%}, W/T/L {self.wins}/{self.ties}/{self.losses}')
+
+class PlayerStats(SeatStats):
+    """
+    Live statistics of one player at the table, updated in O(1) once per round by
+    resolve_results and cheap to query at any time. On top of SeatStats it keeps a
+    Welford mean/variance of the per-round net, the peak chip count, the maximum
+    drawdown of the player's profit and the return on investment.
+    Args:
+        player (Player): The tracked player, before their bets of the first round are settled.
+    """
+    def __init__(self, player):
+        super().__init__(player.name)
+        self.player = player
+        self.net_mean = 0.0
+        self.net_m2 = 0.0
+        self.chips = player.chips + player.total_bet()
+        self.invested = player.total_chips_added
+        self.peak_chips = self.chips
+        # Drawdown is measured on profit (chips minus chips bought) so rebuys don't count as gains
+        self.peak_profit = self.chips - self.invested
+        self.max_drawdown = 0
+
+    def update(self, net, busted, count=None):
+        """Records a settled round of the tracked player (see SeatStats.record for `count`)."""
+        self.record(self.player.total_bet(), net, busted, count)
+        x = to_float(net)
+        delta = x - self.net_mean
+        self.net_mean += delta / self.rounds
+        self.net_m2 += delta * (x - self.net_mean)
+        self.sync()
+        if self.chips > self.peak_chips:
+            self.peak_chips = self.chips
+        profit = self.chips - self.invested
+        if profit > self.peak_profit:
+            self.peak_profit = profit
+        elif self.peak_profit - profit > self.max_drawdown:
+            self.max_drawdown = self.peak_profit - profit
+
+    def sync(self):
+        """Refreshes the chip and investment snapshot from the player (e.g. after a rebuy)."""
+        self.chips = self.player.chips
+        self.invested = self.player.total_chips_added
+
+    @property
+    def net_variance(self):
+        """Sample variance of the per-round net in chips."""
+        return self.net_m2 / (self.rounds - 1) if self.rounds > 1 else 0.0
+
+    @property
+    def roi(self):
+        """Chips held per chip bought, the summary's return rate."""
+        return self.chips / self.invested if self.invested else 0.0
+
+class SimulationResult:
+    """
+    The outcome of GameManager.simulate() or run_parallel_simulation().
+    Attributes:
+        rounds (int): Number of rounds played.
+        seats (list of SeatStats): Per-seat statistics, in seat order.
+        trajectories (np.ndarray): Chip counts sampled every `record_every` rounds,
+            shape (samples, seats). None for merged parallel runs.
+        record_every (int): Sampling interval of the trajectories.
+    """
+    def __init__(self, rounds, seats, trajectories=None, record_every=None):
+        self.rounds = rounds
+        self.seats = seats
+        self.trajectories = trajectories
+        self.record_every = record_every
+
+    def __str__(self):
+        return '\n'.join([f'{self.rounds} rounds'] + [str(s) for s in self.seats])
+
+class SimulationRun:
+    """
+    The progress of one simulate() call. It is part of the session checkpoint,
+    so an interrupted simulation can be finished with GameManager.resume_simulation().
+    Args:
+        n_rounds (int): Rounds the run plays in total.
+        policy (SeatPolicy): Decisions for the human seats.
+        record_every (int): Chip trajectory sampling interval.
+        seats (list of Player): The players in seat order.
+    """
+    def __init__(self, n_rounds, policy, record_every, seats):
+        self.n_rounds = n_rounds
+        self.policy = policy
+        self.record_every = record_every
+        self.done = 0
+        self.stats = [SeatStats(p.name) for p in seats]
+        self.trajectories = np.zeros((n_rounds // record_every, len(seats)))
+        self.initial_chips = [p.chips for p in seats]
+
+# --- Risk of Ruin ---
+
+RUIN_TABLE_SIZE = 1 << 16  # Resolution of the sampling tables: outcomes rarer than this are rounded
+RUIN_CHUNK = 1 << 20  # Returns drawn per batch, over all paths
+
+class ReturnModel:
+    """
+    The distribution of a seat's per-round return per unit bet, for risk_of_ruin().
+    Draws go through an inverse-CDF lookup table, so a batch of millions costs one
+    random integer array and one gather. With counts, each round's true count is
+    drawn from their frequencies and the return is shifted by that count's edge
+    over the average one; rounds are independent, so counts don't persist within a shoe.
+    Args:
+        values (sequence of float): Returns per unit bet.
+        probs (sequence of float): Their weights.
+        counts (sequence of float, optional): True counts.
+        count_probs (sequence of float, optional): Their weights.
+        count_shifts (sequence of float, optional): Edge at each count minus the mean return.
+    Raises:
+        ValueError: If the weights are empty or don't match the values.
+    """
+    def __init__(self, values, probs, counts=None, count_probs=None, count_shifts=None):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.probs = self._normalize(probs, len(self.values))
+        self._returns = self.values[self._table(self.probs)]
+        self.counts = None
+        if counts is not None:
+            self.counts = np.asarray(counts, dtype=np.float64)
+            self.count_probs = self._normalize(count_probs, len(self.counts))
+            index = self._table(self.count_probs)
+            self._counts = self.counts[index]
+            self._shifts = np.zeros(len(self.counts)) if count_shifts is None else np.asarray(count_shifts, dtype=np.float64)
+            self._shifts = self._shifts[index]
+
+    @staticmethod
+    def _normalize(probs, n):
+        probs = np.asarray(probs, dtype=np.float64)
+        if len(probs) != n or n == 0 or probs.sum() <= 0:
+            raise ValueError('Weights must match the values and not all be zero.')
+        return probs / probs.sum()
+
+    @staticmethod
+    def _table(probs):
+        """Maps RUIN_TABLE_SIZE evenly spaced quantiles to outcome indices."""
+        quantiles = (np.arange(RUIN_TABLE_SIZE) + 0.5) / RUIN_TABLE_SIZE
+        index = np.searchsorted(np.cumsum(probs), quantiles, side='right')
+        return np.minimum(index, len(probs) - 1)
+
+    @classmethod
+    def from_stats(cls, stats):
+        """
+        Builds the model from a simulated seat: its return histogram and, when the
+        shoe was tracked, its edge by true count.
+        Args:
+            stats (SeatStats): The seat's statistics.
+        Raises:
+            ValueError: If the seat played no rounds.
+        """
+        if not stats.rounds:
+            raise ValueError(f'{stats.name} played no rounds.')
+        hist, centers = stats.histogram
+        if not stats.by_count:
+            return cls(centers, hist)
+        by_count = stats.ev_by_count()
+        counts = list(by_count)
+        return cls(centers, hist, counts, [rounds for rounds, _ in by_count.values()],
+                   [mean - stats.mean for _, mean in by_count.values()])
+
+    @property
+    def mean(self):
+        """Expected return per unit bet."""
+        return float(self.values @ self.probs)
+
+    def sample(self, rng, shape):
+        """
+        Draws returns and true counts.
+        Args:
+            rng (np.random.Generator): The generator.
+            shape (tuple): Shape of the draw.
+        Returns:
+            tuple: (returns, true counts), the counts None without a count model.
+        """
+        returns = self._returns[rng.integers(0, RUIN_TABLE_SIZE, shape, dtype=np.uint32)]
+        if self.counts is None:
+            return returns, None
+        index = rng.integers(0, RUIN_TABLE_SIZE, shape, dtype=np.uint32)
+        returns += self._shifts[index]
+        return returns, self._counts[index]
+
+class RuinEstimate:
+    """
+    The result of risk_of_ruin().
+    Attributes:
+        probability (float): Fraction of paths that went broke.
+        ruin_round (np.ndarray): Round in which each path went broke (1-based), 0 if it survived.
+        final (np.ndarray): Bankroll of each path at the end.
+        n_rounds (int): Rounds simulated per path.
+    """
+    def __init__(self, ruin_round, final, n_rounds):
+        self.ruin_round = ruin_round
+        self.final = final
+        self.n_rounds = n_rounds
+        self.probability = float(np.count_nonzero(ruin_round)) / len(ruin_round)
+
+    @property
+    def std_error(self):
+        """Standard error of the ruin probability."""
+        return math.sqrt(self.probability * (1 - self.probability) / len(self.ruin_round))
+
+    def ruined_by(self, rounds):
+        """Returns the fraction of paths broke within the first `rounds` rounds."""
+        return float(np.count_nonzero((self.ruin_round > 0) & (self.ruin_round <= rounds))) / len(self.ruin_round)
+
+    def __str__(self):
+        low, median, high = np.percentile(self.final, [5, 50, 95])
+        return (f'Risk of ruin over {self.n_rounds} rounds: {self.probability:.2%} ± {self.std_error:.2%} '
+                f'({len(self.ruin_round)} paths), final bankroll 5%/50%/95%: {low:.0f}/{median:.0f}/{high:.0f}')
+
+def risk_of_ruin(betting, bankroll, n_rounds, model, n_paths=10000, seed=None):
+    """
+    Estimates the chance that a bankroll played with a bet sizer goes broke, i.e.
+    falls below the table minimum, within `n_rounds` rounds. All paths advance
+    together on NumPy arrays, one round at a time, so 10k paths of 10k rounds
+    take seconds.
+    Args:
+        betting (BetSizer): The bet sizing under test, with the table limits.
+        bankroll (int): Starting chips of every path.
+        n_rounds (int): Rounds per path.
+        model (ReturnModel): Per-round returns, e.g. ReturnModel.from_stats(seat).
+        n_paths (int): Number of simulated bankrolls.
+        seed (int, optional): Seed for a reproducible estimate.
+    Returns:
+        RuinEstimate: Ruin probability, ruin rounds and final bankrolls.
+    """
+    rng = np.random.default_rng(seed)
+    chips = np.full(n_paths, float(bankroll))
+    alive = chips >= betting.min_bet
+    ruin_round = np.where(alive, 0, 1)
+    chunk = max(1, RUIN_CHUNK // n_paths)
+    done = 0
+    while done < n_rounds and alive.any():
+        m = min(chunk, n_rounds - done)
+        returns, counts = model.sample(rng, (m, n_paths))
+        for r in range(m):
+            bets = betting.bets(chips, 0.0 if counts is None else counts[r], rng)
+            bets *= alive
+            bets *= returns[r]
+            chips += bets
+            np.maximum(chips, 0.0, out=chips)
+            broke = alive & (chips < betting.min_bet)
+            if broke.any():
+                ruin_round[broke] = done + r + 1
+                alive &= ~broke
+        done += m
+    return RuinEstimate(ruin_round, chips, n_rounds)
+
+# --- Instrumentation ---
+
+# GameManager methods timed by a Profiler, and the phase each one is reported as
+PROFILED_METHODS = {
+    'handle_bets': 'handle_bets',
+    'collect_bot_bets': 'bot_bets',
+    'play_round': 'play_round',
+    'deal_initial_cards': 'dealing',
+    'play_human_turn': 'player_turn',
+    'play_bot_turn': 'player_turn',
+    'play_dealer_turn': 'dealer_turn',
+    'resolve_results': 'resolve_results',
+    # The phases of simulate() rounds, which deal and play through the methods above
+    '_simulate_round': 'simulate_round',
+    '_simulate_bets': 'handle_bets',
+    'play_policy_turn': 'player_turn',
+    '_simulate_settle': 'resolve_results',
+}
+PROFILE_BUCKETS = 48  # Duration histogram buckets: bucket b holds times below 2**b ns
+
+class PhaseStats:
+    """Aggregated timings of one phase: count, total, extremes and a log2 histogram."""
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.alloc_blocks = 0
+        self.buckets = [0] * PROFILE_BUCKETS
+
+    def record(self, duration_ns, alloc_blocks):
+        """Adds one timed call."""
+        self.count += 1
+        self.total_ns += duration_ns
+        if self.min_ns is None or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.alloc_blocks += alloc_blocks
+        self.buckets[min(duration_ns.bit_length(), PROFILE_BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """Returns an upper bound of the q-th percentile duration (0-100) in ns, from the histogram."""
+        target = self.count * q / 100
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return min(2 ** b, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Returns the phase statistics as plain values for JSON."""
+        return {
+            'count': self.count,
+            'total_ms': self.total_ns / 1e6,
+            'mean_us': self.total_ns / self.count / 1e3 if self.count else 0.0,
+            'min_us': (self.min_ns or 0) / 1e3,
+            'p50_us': self.percentile(50) / 1e3,
+            'p99_us': self.percentile(99) / 1e3,
+            'max_us': self.max_ns / 1e3,
+            'alloc_blocks': self.alloc_blocks,
+            # Non-empty buckets keyed by their upper bound in ns
+            'histogram_ns': {2 ** b: n for b, n in enumerate(self.buckets) if n},
+        }
+
+class Profiler:
+    """
+    Opt-in instrumentation of a GameManager (see GameManager.enable_profiling).
+    While attached it times every round phase, counts card draws and get_value()
+    calls and tracks net memory blocks allocated per phase. Detached, it leaves
+    nothing behind: the game's own methods run untouched.
+    Several profilers may be attached to different games at once; each counts only
+    the get_value() calls made inside its own game's phases.
+    Args:
+        trace_limit (int): Maximum trace events kept; later ones are only aggregated.
+    """
+    # Hand.get_value() is patched on the class, shared by every attached profiler:
+    # the original, the number of attached games and the counters of the profiled
+    # phases running right now (innermost last)
+    _get_value = None
+    _attached = 0
+    _scopes = []
+
+    def __init__(self, trace_limit=200000):
+        self.phases = {}
+        self.counters = {'card_draws': 0, 'get_value': 0}
+        self.trace = []
+        self.trace_limit = trace_limit
+        self.dropped_events = 0
+        self.origin_ns = time.perf_counter_ns()
+
+    def phase(self, name):
+        """Returns the PhaseStats of a phase, creating them on first use."""
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(name)
+        return stats
+
+    def timed(self, name, func):
+        """Wraps `func` so every call is recorded as phase `name`."""
+        stats = self.phase(name)
+        trace = self.trace
+        perf_counter_ns = time.perf_counter_ns
+        allocated_blocks = sys.getallocatedblocks
+
+        def timed_call(*args, **kwargs):
+            blocks = allocated_blocks()
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = perf_counter_ns() - start
+                stats.record(duration, allocated_blocks() - blocks)
+                if len(trace) < self.trace_limit:
+                    trace.append((name, start, duration))
+                else:
+                    self.dropped_events += 1
+        return timed_call
+
+    def counted(self, counter, func):
+        """Wraps `func` so every call increments `counter`."""
+        counters = self.counters
+
+        def counted_call(*args, **kwargs):
+            counters[counter] += 1
+            return func(*args, **kwargs)
+        return counted_call
+
+    def scoped(self, func):
+        """Wraps `func` so the get_value() calls made during it count for this profiler."""
+        scopes = Profiler._scopes
+        counters = self.counters
+
+        def scoped_call(*args, **kwargs):
+            scopes.append(counters)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                scopes.pop()
+        return scoped_call
+
+    @staticmethod
+    def _counted_get_value(hand):
+        """Hand.get_value() while profilers are attached, counted for the innermost profiled phase."""
+        scopes = Profiler._scopes
+        if scopes:
+            scopes[-1]['get_value'] += 1
+        return Profiler._get_value(hand)
+
+    def attach(self, game):
+        """Installs the timing and counting wrappers on a game and its deck."""
+        for method, phase in PROFILED_METHODS.items():
+            setattr(game, method, self.scoped(self.timed(phase, getattr(game, method))))
+        new_deck = game.new_deck
+        game.new_deck = lambda seed: self.attach_deck(new_deck(seed))
+        self.attach_deck(game.deck)
+        # Hands are created everywhere, so get_value() is patched on the class while
+        # any game is profiled and each call is counted for the game playing it
+        if Profiler._attached == 0:
+            Profiler._get_value = Hand.get_value
+            Hand.get_value = Profiler._counted_get_value
+        Profiler._attached += 1
+
+    def attach_deck(self, deck):
+        """Times the reshuffles of a deck and counts its card draws."""
+        deck.reshuffle = self.timed('reshuffle', deck.reshuffle)
+        deck.deal_card = self.counted('card_draws', deck.deal_card)
+        return deck
+
+    def detach(self, game):
+        """Removes every wrapper installed by attach()."""
+        for method in list(PROFILED_METHODS) + ['new_deck']:
+            vars(game).pop(method, None)
+        vars(game.deck).pop('reshuffle', None)
+        vars(game.deck).pop('deal_card', None)
+        Profiler._attached -= 1
+        if Profiler._attached == 0:
+            Hand.get_value = Profiler._get_value
+            Profiler._get_value = None
+
+    def histograms(self):
+        """
+        Returns the aggregated statistics of every phase plus the counters.
+        Returns:
+            dict: 'phases' (name to PhaseStats.summary()) and 'counters'.
+        """
+        return {
+            'phases': {name: stats.summary() for name, stats in self.phases.items() if stats.count},
+            'counters': dict(self.counters),
+        }
+
+    def trace_events(self):
+        """
+        Returns the recorded calls in the Chrome trace event format, viewable in
+        chrome://tracing, Perfetto or speedscope.
+        Returns:
+            dict: A trace with complete ('X') events and a final counter ('C') event.
+        """
+        pid = os.getpid()
+        events = [{'name': name, 'cat': 'blackjack', 'ph': 'X', 'pid': pid, 'tid': 0,
+                   'ts': (start - self.origin_ns) / 1e3, 'dur': duration / 1e3}
+                  for name, start, duration in self.trace]
+        end = max((e['ts'] + e['dur'] for e in events), default=0.0)
+        events.append({'name': 'counters', 'ph': 'C', 'pid': pid, 'tid': 0, 'ts': end,
+                       'args': dict(self.counters)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'dropped_events': self.dropped_events}}
+
+    def write_trace(self, filepath):
+        """Writes trace_events() as a JSON file."""
+        with open(filepath, 'w') as file:
+            json.dump(self.trace_events(), file)
+
+    def write_histograms(self, filepath):
+        """Writes histograms() as a JSON file."""
+        with open(filepath, 'w') as file:
+            json.dump(self.histograms(), file, indent=2)
+
+    def __str__(self):
+        lines = [f'{"phase":<16} {"calls":>9} {"total ms":>10} {"mean us":>9} {"p99 us":>9} {"blocks":>8}']
+        for name, stats in sorted(self.phases.items(), key=lambda item: -item[1].total_ns):
+            if not stats.count:
+                continue
+            s = stats.summary()
+            lines.append(f'{name:<16} {s["count"]:>9} {s["total_ms"]:>10.2f} {s["mean_us"]:>9.2f} '
+                         f'{s["p99_us"]:>9.2f} {s["alloc_blocks"]:>8}')
+        lines.append(', '.join(f'{name}: {count}' for name, count in self.counters.items()))
+        return '\n'.join(lines)
+
+# --- Checkpoints ---
+
+CHECKPOINT_MAGIC = b'BJCKPT01'
+
+def write_checkpoint(filepath, state):
+    """
+    Atomically writes a session state to a compact checkpoint file.
+    The state is pickled and compressed into a temporary file next to the target,
+    synced to disk and renamed over it, so a crash leaves either the old or the new
+    checkpoint, never a partial one.
+    Args:
+        filepath (str): The checkpoint file.
+        state (dict): A state from GameManager.checkpoint_state().
+    """
+    data = CHECKPOINT_MAGIC + zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL), 1)
+    tmp_path = f'{filepath}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, filepath)
+
+def read_checkpoint(filepath):
+    """
+    Reads a session state written by write_checkpoint().
+    Returns:
+        dict: The state, for GameManager.from_state().
+    Raises:
+        ValueError: If the file is not a checkpoint.
+    """
+    with open(filepath, 'rb') as file:
+        data = file.read()
+    if not data.startswith(CHECKPOINT_MAGIC):
+        raise ValueError(f'{filepath} is not a checkpoint file.')
+    return pickle.loads(zlib.decompress(data[len(CHECKPOINT_MAGIC):]))
+
+def _hand_codes(player):
+    """Returns the cards of a player's hand as a bytes string of card codes."""
+    return bytes(card_code(card) for card in player.hand.cards)
+
+# --- Seating ---
+
+MAX_SEATS = 7
+
+class SeatMap:
+    """
+    The seat array of a table: humans sit where they chose and the bots fill the
+    remaining seats in order. It is computed once per seating change, so dealing and
+    turns just walk `players` and seat lookups are a single dictionary access.
+    Args:
+        humans (list of tuple): (Player, seat) pairs, seats numbered from 1.
+        bots (list of BotPlayer): Bots in the order they take the free seats.
+    Raises:
+        ValueError: If the table would have no seats or more than MAX_SEATS, or a
+            human's seat is out of range or already taken.
+    """
+    def __init__(self, humans, bots):
+        num_seats = len(humans) + len(bots)
+        if not 1 <= num_seats <= MAX_SEATS:
+            raise ValueError(f'A table has 1 to {MAX_SEATS} seats, not {num_seats}.')
+        players = [None] * num_seats
+        for player, seat in humans:
+            if not 1 <= seat <= num_seats or players[seat - 1] is not None:
+                raise ValueError(f'Seat {seat} is not available for {player.name}.')
+            players[seat - 1] = player
+        free_bots = iter(bots)
+        for i in range(num_seats):
+            if players[i] is None:
+                players[i] = next(free_bots)
+        self.players = players
+        self.humans = [p for p in players if not isinstance(p, BotPlayer)]
+        self.seats = {p: i for i, p in enumerate(players)}
+
+    def __len__(self):
+        return len(self.players)
+
+    def __iter__(self):
+        return iter(self.players)
+
+    def seat_of(self, player):
+        """Returns the 0-based seat index of a seated player."""
+        return self.seats[player]
+
+    def by_seat(self):
+        """Returns a dictionary mapping seat number (from 1) to player."""
+        return {i + 1: p for i, p in enumerate(self.players)}
+
+# --- Bot Rosters ---
+
+# Binary rosters: a header (magic, number of bots, number of strategy files), the
+# strategy file paths as length-prefixed UTF-8, then one fixed-size record per bot
+ROSTER_MAGIC = b'BJROST01'
+ROSTER_HEADER = struct.Struct('<8sII')
+ROSTER_PATH = struct.Struct('<H')
+ROSTER_RECORD = np.dtype([('name', 'S32'), ('chips', '<i8'), ('seed', '<i8'), ('strategy', '<i4')])
+ROSTER_CHUNK = 4096  # Binary records read per batch
+
+class RosterError(ValueError):
+    """
+    A roster file with invalid entries. All problems found are reported, each with
+    its line (CSV) or record number (binary), counted from 1.
+    Attributes:
+        filepath (str): The roster file.
+        errors (list of tuple): (line, message) pairs in file order.
+    """
+    def __init__(self, filepath, errors):
+        self.filepath = filepath
+        self.errors = errors
+        super().__init__(f'{filepath}: {len(errors)} invalid entr{"y" if len(errors) == 1 else "ies"}\n'
+                         + '\n'.join(f'  line {line}: {message}' for line, message in errors))
+
+def _csv_records(file):
+    """
+    Parses a CSV roster, one `name,chips,seed[,strategy file]` bot per line.
+    Blank lines and lines starting with # are skipped.
+    Yields:
+        tuple: (line, (name, chips, seed, strategy path or None), None), or (line, None, message).
+    """
+    for line_no, line in enumerate(file, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split(',')
+        if len(parts) not in (3, 4):
+            yield line_no, None, f'expected name,chips,seed[,strategy], got {len(parts)} columns'
+            continue
+        name = parts[0].strip()
+        try:
+            chips = int(parts[1])
+        except ValueError:
+            yield line_no, None, f'chips {parts[1].strip()!r} is not an integer'
+            continue
+        try:
+            seed = int(parts[2])
+        except ValueError:
+            yield line_no, None, f'seed {parts[2].strip()!r} is not an integer'
+            continue
+        strategy = (parts[3].strip() or None) if len(parts) == 4 else None
+        yield line_no, (name, chips, seed, strategy), None
+
+def _binary_records(file, filepath):
+    """Parses a binary roster (see write_roster) in batches of ROSTER_CHUNK records."""
+    header = file.read(ROSTER_HEADER.size)
+    if len(header) < ROSTER_HEADER.size or header[:8] != ROSTER_MAGIC:
+        raise RosterError(filepath, [(0, 'not a binary roster file')])
+    _, count, n_paths = ROSTER_HEADER.unpack(header)
+    paths = []
+    try:
+        for _ in range(n_paths):
+            length, = ROSTER_PATH.unpack(file.read(ROSTER_PATH.size))
+            paths.append(file.read(length).decode('utf-8'))
+    except (struct.error, UnicodeDecodeError):
+        raise RosterError(filepath, [(0, 'corrupt strategy file table')]) from None
+    record = 0
+    while record < count:
+        data = file.read(ROSTER_RECORD.itemsize * min(ROSTER_CHUNK, count - record))
+        batch = np.frombuffer(data[:len(data) - len(data) % ROSTER_RECORD.itemsize], dtype=ROSTER_RECORD)
+        for raw_name, chips, seed, strategy in batch.tolist():
+            record += 1
+            try:
+                name = raw_name.decode('utf-8')
+            except UnicodeDecodeError:
+                yield record, None, 'name is not valid UTF-8'
+                continue
+            if not -1 <= strategy < len(paths):
+                yield record, None, f'strategy index {strategy} out of range'
+                continue
+            yield record, (name, chips, seed, None if strategy < 0 else paths[strategy]), None
+        if len(batch) == 0 or len(data) % ROSTER_RECORD.itemsize:
+            yield record + 1, None, f'file truncated: {count} records expected, {record} found'
+            return
+
+def _checked_records(filepath):
+    """
+    Yields every entry of a roster file, CSV or binary (told apart by the magic), as
+    (line, (name, chips, seed, strategy path), error), with the chips, the names'
+    uniqueness and the strategy files checked.
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+    """
+    seen = {}
+    failed_strategies = {}
+    with open(filepath, 'rb') as file:
+        binary = file.read(len(ROSTER_MAGIC)) == ROSTER_MAGIC
+    if binary:
+        file = open(filepath, 'rb')
+        records = _binary_records(file, filepath)
+    else:
+        file = open(filepath, 'r', encoding='utf-8')
+        records = _csv_records(file)
+    with file:
+        for line, entry, error in records:
+            if error is None:
+                name, chips, seed, strategy = entry
+                if not name:
+                    error = 'empty name'
+                elif chips < 1:
+                    error = f'chips must be at least 1, got {chips}'
+                elif name in seen:
+                    error = f'duplicate name {name!r} (first on line {seen[name]})'
+                elif strategy is not None:
+                    if strategy not in failed_strategies:
+                        try:
+                            load_strategy(strategy)
+                        except (OSError, ValueError) as exc:
+                            failed_strategies[strategy] = f'strategy {strategy!r}: {exc}'
+                    error = failed_strategies.get(strategy)
+                if error is None:
+                    seen[name] = line
+            yield line, entry, error
+
+def _roster_bot(entry):
+    """Creates the BotPlayer of a validated roster entry."""
+    name, chips, seed, strategy = entry
+    return BotPlayer(name, chips, seed, None if strategy is None else load_strategy(strategy))
+
+def read_roster(filepath):
+    """
+    Loads a whole roster, validating every entry before any bot is created, so a
+    roster either loads completely or not at all.
+    Args:
+        filepath (str): A CSV or binary roster file.
+    Returns:
+        list of BotPlayer: The bots in file order.
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+        RosterError: With every invalid entry, if there are any.
+    """
+    entries = []
+    errors = []
+    for line, entry, error in _checked_records(filepath):
+        if error is None:
+            entries.append(entry)
+        else:
+            errors.append((line, error))
+    if errors:
+        raise RosterError(filepath, errors)
+    return [_roster_bot(entry) for entry in entries]
+
+def iter_roster(filepath):
+    """
+    Lazily yields the validated entries of a roster without creating bots, e.g. to
+    convert a CSV roster with write_roster().
+    Yields:
+        tuple: (name, chips, seed, strategy path or None).
+    Raises:
+        RosterError: At the first invalid entry; the entries before it were already yielded.
+    """
+    for line, entry, error in _checked_records(filepath):
+        if error is not None:
+            raise RosterError(filepath, [(line, error)])
+        yield entry
+
+def stream_roster(filepath):
+    """
+    Lazily yields the bots of a roster, one at a time, for rosters too large to
+    hold at once (see roster_tables()). Validation is per entry, as for iter_roster().
+    Yields:
+        BotPlayer: The next bot.
+    """
+    for entry in iter_roster(filepath):
+        yield _roster_bot(entry)
+
+def roster_tables(bots, seats=MAX_SEATS - 1):
+    """
+    Groups a stream of bots into tables, consuming it lazily.
+    Args:
+        bots (iterable of BotPlayer): E.g. stream_roster(filepath).
+        seats (int): Bots per table; the last table may have fewer.
+    Yields:
+        list of BotPlayer: The bots of the next table.
+    """
+    table = []
+    for bot in bots:
+        table.append(bot)
+        if len(table) == seats:
+            yield table
+            table = []
+    if table:
+        yield table
+
+def write_roster(filepath, entries):
+    """
+    Atomically writes a binary roster (the same temporary file and rename as
+    write_checkpoint()).
+    Args:
+        filepath (str): The roster file.
+        entries (iterable of tuple): (name, chips, seed, strategy path or None), e.g. iter_roster().
+    Raises:
+        ValueError: If a name is longer than the record's 32 bytes.
+    """
+    paths = {}
+    records = []
+    for name, chips, seed, strategy in entries:
+        encoded = name.encode('utf-8')
+        if len(encoded) > ROSTER_RECORD['name'].itemsize:
+            raise ValueError(f'Bot name {name!r} is longer than {ROSTER_RECORD["name"].itemsize} bytes.')
+        index = -1 if strategy is None else paths.setdefault(strategy, len(paths))
+        records.append((encoded, chips, seed, index))
+    table = np.array(records, dtype=ROSTER_RECORD)
+    tmp_path = f'{filepath}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(ROSTER_HEADER.pack(ROSTER_MAGIC, len(table), len(paths)))
+        for path in paths:
+            encoded = path.encode('utf-8')
+            file.write(ROSTER_PATH.pack(len(encoded)) + encoded)
+        file.write(table.tobytes())
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, filepath)
+
+class GameManager:
+    """Manages the overall flow of the Blackjack game."""
+    def __init__(self, player_name, player_chips, player_sit, deck_seed, num_decks=None, penetration=0.75,
+                 rules=None):
+        # With num_decks set the table deals from a multi-deck Shoe instead of the classic single Deck
+        self.num_decks = num_decks
+        self.penetration = penetration
+        # ShoeTracker of the deck once track_shoe() is called, and the rounded true
+        # count at the start of the current round
+        self.tracker = None
+        self.round_count = None
+        self.deck = self.new_deck(deck_seed)
+        self.player = Player(player_name, player_chips)
+        self.dealer = Dealer()
+        self.rules = Rules() if rules is None else rules
+        self.player_sit = player_sit
+        # More humans beyond the main player, as (Player, seat) pairs; see add_player
+        self.other_humans = []
+        self.bots = []
+        # Where round events go: the console by default, NullSink for silent runs,
+        # EventSink for a binary log or a TeeSink combining several
+        self.sink = ConsoleRenderer(self.player)
+        # Running PlayerStats per player, updated as rounds are settled
+        self.stats = {}
+        self.rounds_played = 0
+        # Background image rendering; with snapshot_every set, a summary image is
+        # queued every that many rounds during long sessions
+        self.summary_renderer = None
+        self.snapshot_every = None
+        # With checkpoint_every set, the session is saved to checkpoint_path every
+        # that many rounds; see load_checkpoint() to resume it
+        self.checkpoint_every = None
+        self.checkpoint_path = 'session.ckpt'
+        self.simulation = None
+        self.profiler = None
+
+    def new_deck(self, seed):
+        """Creates the table's deck: a classic Deck, or a Shoe when num_decks is set."""
+        if self.num_decks is None:
+            deck = Deck(seed=seed)
+        else:
+            deck = Shoe(self.num_decks, self.penetration, seed=seed)
+        if self.tracker is not None:
+            deck.track(self.tracker)
+        return deck
+
+    def track_shoe(self):
+        """
+        Tracks the composition and counts of the table's deck from now on, including
+        later decks. Bots see the tracker as `bot.tracker`, and statistics are
+        bucketed by the true count at the start of each round.
+        Returns:
+            ShoeTracker: The table's tracker.
+        """
+        if self.tracker is None:
+            self.tracker = ShoeTracker(self.num_decks or 1)
+        self.deck.track(self.tracker)
+        for bot in self.bots:
+            bot.tracker = self.tracker
+        return self.tracker
+
+    def current_count(self):
+        """Returns the rounded Hi-Lo true count, or None when the shoe isn't tracked."""
+        if self.tracker is None:
+            return None
+        return round(self.tracker.true_count())
+
+    def check_count_betting(self, policy=None):
+        """
+        Makes sure every count-based bet sizer at the table can see the count. On an
+        untracked table the true count stays 0 and such a sizer would silently flat bet.
+        Args:
+            policy (SeatPolicy, optional): Decisions for the human seats.
+        Raises:
+            ValueError: If a bot or the policy bets on the count and the shoe isn't tracked.
+        """
+        if self.tracker is not None:
+            return
+        sizers = [bot.betting for bot in self.bots]
+        if policy is not None:
+            sizers.append(policy.betting)
+        if any(sizer is not None and sizer.needs_count for sizer in sizers):
+            raise ValueError('Count-based betting needs a tracked shoe, call track_shoe() first.')
+
+    def enable_profiling(self, profiler=None):
+        """
+        Starts timing the phases of every round (bets, dealing, turns, dealer,
+        resolve_results, reshuffles) and counting card draws and get_value() calls.
+        Args:
+            profiler (Profiler, optional): Collects the measurements. Defaults to a new one.
+        Returns:
+            Profiler: The attached profiler.
+        """
+        self.disable_profiling()
+        self.profiler = Profiler() if profiler is None else profiler
+        self.profiler.attach(self)
+        return self.profiler
+
+    def disable_profiling(self):
+        """Stops profiling; the game runs without any instrumentation again."""
+        if self.profiler is not None:
+            self.profiler.detach(self)
+            self.profiler = None
+
+    @property
+    def rules(self):
+        """The table's Rules; assigning new rules also sets the dealer's soft 17 rule."""
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules):
+        self._rules = rules
+        self.dealer.hit_soft_17 = rules.hit_soft_17
+
+    @property
+    def bots(self):
+        """The bots at the table; assigning a new list reseats the table."""
+        return self._bots
+
+    @bots.setter
+    def bots(self, bots):
+        self._bots = bots
+        self._seat_map = None
+
+    @property
+    def seat_map(self):
+        """The table's SeatMap, built on first use after the seating changed."""
+        if self._seat_map is None:
+            humans = [(self.player, self.player_sit)] + self.other_humans
+            self._seat_map = SeatMap(humans, self._bots)
+            if self.tracker is not None:
+                # Bots seated after track_shoe() see the table's tracker too
+                for bot in self._bots:
+                    bot.tracker = self.tracker
+        return self._seat_map
+
+    def add_player(self, player, seat):
+        """
+        Seats another human player.
+        Args:
+            player (Player): The new player.
+            seat (int): The chosen seat, numbered from 1.
+        """
+        self.other_humans.append((player, seat))
+        self._seat_map = None
+
+    def remove_player(self, player):
+        """Removes a human other than the main player from the table."""
+        self.other_humans = [(p, seat) for p, seat in self.other_humans if p is not player]
+        self._seat_map = None
+
+    def humans(self):
+        """Returns the human players, the main player first."""
+        return [self.player] + [p for p, _ in self.other_humans]
+
+    def seat_of(self, player):
+        """Returns the 0-based seat index of a player, or DEALER_SEAT for the dealer."""
+        if player is self.dealer:
+            return DEALER_SEAT
+        return self.seat_map.seat_of(player)
+
+    def load_players_from_file(self, filepath):
+        """
+        Loads the bots from a roster file (see read_roster). An invalid roster, or
+        one with more bots than the free seats of a MAX_SEATS table, is reported
+        and leaves the table's bots as they were.
+        """
+        try:
+            bots = read_roster(filepath)
+        except FileNotFoundError:
+                print(f'File not found: {filepath}')
+                return
+        except RosterError as error:
+                print('Invalid data format in player file.')
+                print(error)
+                return None
+        free_seats = MAX_SEATS - len(self.humans())
+        if len(bots) > free_seats:
+            print(f'Too many bots in player file: {len(bots)}, but only {free_seats} seats are free.')
+            return None
+        self.bots = bots
+        for bot in self.bots:
+            print(bot)
+
+    def start_game(self):
+        """Initiates and runs the main game loop."""
+        print('Welcome to Blackjack!')
+        print('Nothing is left to chance when you are an engineer.')
+
+        deck_seed = get_valid_int('Enter a seed value for the game: ')
+        self.deck = self.new_deck(deck_seed)
+        self.play_session()
+
+    def play_session(self):
+        """Plays rounds until the player leaves, then shows the summary. A restored game resumes here."""
+        # Main game loop
+        while True:
+            print(f'\n{self.player.name}, you have {self.player.chips} chips.')
+
+            # Handle player running out of chips
+            if self.player.chips == 0:
+                choice = get_valid_choice('You have no chips left. Do you want to buy more? (yes/no): ', ['yes', 'no'])
+                if choice == 'yes':
+                    amount = get_valid_int('Enter amount of chips to add: ', min_val=100, max_val=1000)
+                    self.player.chips = amount
+                    self.player.total_chips_added += amount
+                    self.sink.rebuy(self.seat_of(self.player), self.player, amount)
+                else:
+                    print('You chose to leave the table.')
+                    break
+
+            # The other humans rebuy or leave their seat
+            for p in self.humans()[1:]:
+                if p.chips == 0:
+                    choice = get_valid_choice(f'{p.name}, you have no chips left. Do you want to buy more? (yes/no): ',
+                                              ['yes', 'no'])
+                    if choice == 'yes':
+                        amount = get_valid_int('Enter amount of chips to add: ', min_val=100, max_val=1000)
+                        p.chips = amount
+                        p.total_chips_added += amount
+                        self.sink.rebuy(self.seat_of(p), p, amount)
+                    else:
+                        print(f'{p.name} left the table.')
+                        self.remove_player(p)
+
+            # Ask if the player wants to continue playing
+            play = get_valid_choice('Do you want to play a round? (yes/no): ', ['yes', 'no'])
+            if play!= 'yes':
+                print('You chose to leave the table.')
+                break
+
+            # Reset hands and bets for a new round
+            self.reset_hands()
+
+            self.handle_bets()
+            self.play_round()
+            self.resolve_results()
+
+            # Reshuffle the deck if it's getting low on cards
+            if self.deck.needs_shuffle():
+                self.deck.reshuffle()
+
+            if self.checkpoint_every and self.rounds_played % self.checkpoint_every == 0:
+                self.save_checkpoint()
+
+        self.show_summary()
+
+    def reset_hands(self):
+        """Clears every hand and bet before a new round."""
+        self.dealer.reset_hand()
+        for p in self.seat_map:
+            p.reset_hand()
+        self.round_count = self.current_count()
+
+    def play_round(self):
+        """Manages the logic for a single round of Blackjack."""
+        self.deal_initial_cards()
+
+        # --- Insurance and Peek ---
+        # Only with naturals in play; a dealer natural ends the round before any turn
+        if self.rules.blackjack_pays is None or not self.check_dealer_natural(self.ask_insurance):
+            # --- Player Turns ---
+            for i, p in enumerate(self.seat_map.players):
+                if isinstance(p, BotPlayer):
+                    self.play_bot_turn(i, p)
+                else:
+                    self.play_human_turn(i, p)
+
+        self.play_dealer_turn()
+
+    def deal_initial_cards(self):
+        """Deals two cards to every seat and the dealer, then shows the starting hands."""
+        sink = self.sink
+        sink.dealing_start()
+        seats = self.seat_map.players
+        dealer = self.dealer
+        deal = self._deal
+        sink_deal = sink.deal
+
+        # --- Dealing Phase ---
+        # Deal two cards to each player and the dealer
+        for t in range(2):
+            # Deal to players in seat order
+            for i, p in enumerate(seats):
+                card = deal()
+                p.hand.add_card(card)
+                sink_deal(i, p, card)
+
+            # Dealer gets one card face up, one face down
+            card = deal()
+            if t == 0:
+                dealer.add_card(card)
+            else:
+                dealer.set_hidden_card(card)
+            sink_deal(DEALER_SEAT, dealer, card)
+
+        # --- Show Initial Hands ---
+        for i, p in enumerate(seats):
+            sink.show_hand(i, p)
+        sink.dealer_shows(dealer.hand.cards[0])
+
+    def hit(self, seat, player):
+        """Deals one more card to a player (or the dealer) and returns it."""
+        card = self._deal()
+        player.add_card(card)
+        self.sink.hit(seat, player, card)
+        return card
+
+    def play_human_turn(self, seat, player=None):
+        """Asks a human player (the main player by default) to hit or stand until they stand or bust."""
+        if player is None:
+            player = self.player
+        if not self.rules.hit_stand_only:
+            self.sink.turn_start(seat, player)
+            self.play_hands(seat, player, self.ask_move)
+            return
+        # The main player keeps the original prompt; other humans are asked by name
+        prompt = 'Do you want to \'hit\' or \'stand\'? '
+        if player is not self.player:
+            prompt = f'{player.name}, do you want to \'hit\' or \'stand\'? '
+        self.sink.turn_start(seat, player)
+        while not player.has_bust():
+            move = get_valid_choice(prompt, ['hit', 'stand'])
+            if move == 'hit':
+                self.hit(seat, player)
+            else:
+                if move == 'stand':
+                    break
+                print('Invalid input. Please type \'hit\' or \'stand\'.')
+        self.sink.turn_end(seat, player)
+
+    def play_policy_turn(self, seat, player, policy):
+        """Plays a human seat without input(), `policy` choosing the moves (see SeatPolicy)."""
+        self.sink.turn_start(seat, player)
+        upcard = self.dealer.hand.cards[0]
+        if not self.rules.hit_stand_only:
+            self.play_hands(seat, player, lambda p, options: policy.decide_move(p.hand, upcard, options))
+            return
+        while not player.has_bust() and policy.decide_move(player.hand, upcard) == 'hit':
+            self.hit(seat, player)
+        self.sink.turn_end(seat, player)
+
+    def play_bot_turn(self, seat, bot):
+        """Plays a bot's hand with its own strategy against the dealer's upcard."""
+        self.sink.turn_start(seat, bot)
+        upcard = self.dealer.hand.cards[0]
+        if not self.rules.hit_stand_only:
+            self.play_hands(seat, bot, lambda p, options: p.decide_move(upcard, p.hand, options))
+            return
+        while not bot.has_bust() and bot.decide_move(upcard) == 'hit':
+            self.hit(seat, bot)
+        self.sink.turn_end(seat, bot)
+
+    def ask_move(self, player, options):
+        """Asks a human for one of the allowed moves (the main player without their name)."""
+        moves = ', '.join(f"'{move}'" for move in options[:-1]) + f" or '{options[-1]}'"
+        if player is self.player:
+            return get_valid_choice(f'Do you want to {moves}? ', options)
+        return get_valid_choice(f'{player.name}, do you want to {moves}? ', options)
+
+    def ask_insurance(self, player):
+        """Asks a human whether to take insurance; bots decide for themselves."""
+        if isinstance(player, BotPlayer):
+            return player.wants_insurance()
+        question = f'want insurance for {player.bet // 2} chips? (yes/no): '
+        if player is self.player:
+            return get_valid_choice(f'Do you {question}', ['yes', 'no']) == 'yes'
+        return get_valid_choice(f'{player.name}, do you {question}', ['yes', 'no']) == 'yes'
+
+    def check_dealer_natural(self, wants_insurance):
+        """
+        With naturals in play: offers insurance when the dealer shows an ace (if the
+        rules allow it), then the dealer peeks under an ace or ten.
+        Args:
+            wants_insurance (callable): wants_insurance(player) -> bool.
+        Returns:
+            bool: True if the dealer has a natural, which skips the players' turns.
+        """
+        hand = self.dealer.hand
+        upcard_points = hand.cards[0].points
+        if upcard_points != 1 and upcard_points != 10:
+            return False
+        if upcard_points == 1 and self.rules.insurance:
+            for i, p in enumerate(self.seat_map.players):
+                amount = p.bet // 2
+                if amount and p.chips >= amount and wants_insurance(p):
+                    p.chips -= amount
+                    p.insurance = amount
+                    self.sink.insurance(i, p, amount)
+        natural = hand.is_blackjack()
+        self.sink.dealer_peek(natural)
+        return natural
+
+    def move_options(self, player):
+        """Returns the moves the rules allow for player.hand, the hand being played."""
+        rules = self.rules
+        hand = player.hand
+        two_cards = len(hand.cards) == 2
+        aces = hand.cards[0].points == 1
+        can_split = (two_cards and len(player.splits) < rules.max_splits and hand.is_pair()
+                     and player.chips >= player.bet and (not aces or not player.splits or rules.resplit_aces))
+        # Split aces take one card each unless the rules let them draw
+        if aces and player.splits and not rules.hit_split_aces:
+            return ['stand', 'split'] if can_split else ['stand']
+        options = ['hit', 'stand']
+        if two_cards:
+            if rules.double and player.chips >= player.bet and (not player.splits or rules.double_after_split):
+                options.append('double')
+            if can_split:
+                options.append('split')
+            if rules.surrender and not player.splits:
+                options.append('surrender')
+        return options
+
+    def play_hands(self, seat, player, choose):
+        """
+        Plays a seat under the table rules: its hand, then every split hand in turn.
+        The hand in play is always player.hand (split hands are swapped in), so
+        sinks and strategies see it like an ordinary hand.
+        Args:
+            seat (int): The player's seat.
+            player (Player): The player.
+            choose (callable): choose(player, options) -> one of the moves in options.
+        """
+        self.play_hand(seat, player, choose)
+        number = 0
+        while number < len(player.splits):
+            entry = player.splits[number]
+            entry[0], player.hand = player.hand, entry[0]
+            entry[1], player.bet = player.bet, entry[1]
+            self.sink.hand_start(seat, player, number + 2)
+            self.hit(seat, player)  # The split hand's second card
+            self.play_hand(seat, player, choose)
+            entry[0], player.hand = player.hand, entry[0]
+            entry[1], player.bet = player.bet, entry[1]
+            number += 1
+
+    def play_hand(self, seat, player, choose):
+        """Plays player.hand until it stands, busts, doubles or surrenders."""
+        while not player.has_bust():
+            options = self.move_options(player)
+            if len(options) == 1:
+                break
+            move = choose(player, options)
+            if move not in options:
+                move = 'stand'
+            if move == 'hit':
+                self.hit(seat, player)
+            elif move == 'double':
+                player.chips -= player.bet
+                player.bet *= 2
+                self.sink.double(seat, player)
+                self.hit(seat, player)
+                break
+            elif move == 'split':
+                player.chips -= player.bet
+                split_hand = Hand()
+                split_hand.add_card(player.hand.pop_card())
+                player.splits.append([split_hand, player.bet])
+                self.sink.split(seat, player)
+                self.hit(seat, player)
+            elif move == 'surrender':
+                player.surrendered = True
+                self.sink.surrender(seat, player)
+                break
+            else:
+                break
+        self.sink.turn_end(seat, player)
+
+    def play_dealer_turn(self):
+        """Reveals the hidden card and draws by the dealer's rule."""
+        self.sink.dealer_reveal(self.dealer)
+        while self.dealer.should_draw():
+            self.hit(DEALER_SEAT, self.dealer)
+        self.sink.turn_end(DEALER_SEAT, self.dealer)
+
+    def handle_bets(self):
+        """Collects bets from the human players, then the bots."""
+        for p in self.humans():
+            amount = get_valid_int(f'{p.name}, enter your bet (1 - {p.chips}): ', 1, p.chips)
+            p.place_bet(amount)
+            self.sink.bet(self.seat_of(p), p, amount)
+        self.collect_bot_bets()
+
+    def collect_bot_bets(self):
+        """Bots rebuy if they ran out of chips, then place their bets."""
+        for bot in self.bots:
+            self.place_bot_bet(self.seat_of(bot), bot)
+
+    def place_bot_bet(self, seat, bot):
+        """A bot rebuys if it ran out of chips, then places its bet."""
+        # Rebuy logic for bots
+        if bot.chips == 0:
+            rebuy = bot.rebuy_amount()
+            bot.chips = rebuy
+            bot.total_chips_added = bot.total_chips_added + rebuy
+            self.sink.rebuy(seat, bot, rebuy)
+
+        amount = bot.next_bet()
+        bot.place_bet(amount)
+        self.sink.bet(seat, bot, amount)
+
+    def settle(self, player, dealer_value, dealer_bust):
+        """
+        Pays out one player's bet against the dealer's final hand.
+        Returns:
+            tuple: (hand value, outcome 'bust'/'win'/'tie'/'lose', chips paid out).
+        """
+        value = player.hand.get_value()
+        if value > 21:
+            return value, 'bust', 0
+        if dealer_bust or value > dealer_value:
+            payout = player.bet * 2
+            outcome = 'win'
+        elif value == dealer_value:
+            payout = player.bet
+            outcome = 'tie'
+        else:
+            return value, 'lose', 0
+        player.chips = player.chips + payout
+        return value, outcome, payout
+
+    def settle_seats(self, players):
+        """
+        Settles every hand of the given players against the dealer under the table
+        rules, in one pass: naturals, surrenders, split hands, doubled bets and
+        insurance. Winnings go into the players' chips and each hand is reported
+        to the sink.
+        Returns:
+            list of tuple: (chips wagered, chips paid out, busted) per player.
+        """
+        sink = self.sink
+        dealer_hand = self.dealer.hand
+        dealer_value = dealer_hand.get_value()
+        dealer_bust = dealer_value > 21
+        pays = self.rules.blackjack_pays
+        dealer_natural = pays is not None and dealer_hand.is_blackjack()
+        seat_of = self.seat_map.seats
+        results = []
+        for p in players:
+            seat = seat_of[p]
+            wagered = p.total_bet()
+            paid = 0
+            busted = False
+            if p.insurance:
+                won = 3 * p.insurance if dealer_natural else 0
+                p.chips += won
+                paid += won
+                sink.insurance_result(seat, p, won)
+            hands = [(p.hand, p.bet)] + p.splits if p.splits else ((p.hand, p.bet),)
+            for hand, bet in hands:
+                value = hand.get_value()
+                if p.surrendered:
+                    outcome, payout = 'surrender', bet // 2
+                elif value > 21:
+                    outcome, payout = 'bust', 0
+                    busted = True
+                elif dealer_natural:
+                    outcome, payout = ('tie', bet) if hand.is_blackjack() else ('lose', 0)
+                elif pays is not None and not p.splits and hand.is_blackjack():
+                    outcome, payout = 'blackjack', bet + bet * pays[0] // pays[1]
+                elif dealer_bust or value > dealer_value:
+                    outcome, payout = 'win', 2 * bet
+                elif value == dealer_value:
+                    outcome, payout = 'tie', bet
+                else:
+                    outcome, payout = 'lose', 0
+                p.chips += payout
+                paid += payout
+                sink.result(seat, p, value, outcome, payout)
+            results.append((wagered, paid, busted))
+        return results
+
+    def resolve_results(self):
+        """Determines the outcome for each player and settles bets."""
+        if not self.rules.hit_stand_only:
+            players = self.humans() + self.bots
+            # Stats snapshot the chips before settlement, so create them before paying out
+            stats = [self.player_stats(p) for p in players]
+            for s, (wagered, payout, busted) in zip(stats, self.settle_seats(players)):
+                s.update(payout - wagered, busted, self.round_count)
+            self.end_round()
+            return
+        dealer_value = self.dealer.hand.get_value()
+        dealer_bust = dealer_value > 21
+
+        # Resolve the humans' outcomes first, then the bots'
+        for p in self.humans() + self.bots:
+            stats = self.player_stats(p)
+            value, outcome, payout = self.settle(p, dealer_value, dealer_bust)
+            stats.update(payout - p.bet, outcome == 'bust', self.round_count)
+            self.sink.result(self.seat_of(p), p, value, outcome, payout)
+        self.end_round()
+
+    def end_round(self):
+        """Closes a settled round: tells the sink and takes the periodic summary image."""
+        self.sink.round_end()
+        self.rounds_played += 1
+        if self.snapshot_every and self.rounds_played % self.snapshot_every == 0:
+            self.queue_summary_image(f'table_summary_{self.rounds_played:06d}.png')
+
+    def player_stats(self, player):
+        """Returns the running PlayerStats of a player, creating them on first use."""
+        stats = self.stats.get(player)
+        if stats is None:
+            stats = self.stats[player] = PlayerStats(player)
+        return stats
+
+    def ranking(self):
+        """Returns every player's PlayerStats sorted by return on investment, best first."""
+        ranked = []
+        for p in self.humans() + self.bots:
+            stats = self.player_stats(p)
+            stats.sync()
+            ranked.append(stats)
+        return sorted(ranked, key=lambda stats: stats.roi, reverse=True)
+
+    def show_summary(self):
+        """
+        Displays the final game summary and statistics and saves the table image.
+        Raises:
+            Exception: Whatever drawing or saving a queued image raised.
+        """
+        print('\n--- Game Summary ---')
+        all_players = self.humans() + self.bots
+        chip_counts = [p.chips for p in all_players]
+        avg = np.mean(chip_counts)
+        max_chips = np.max(chip_counts)
+        for p in all_players:
+            print(f'{p.name}: {p.chips} chips')
+        print(f'\nAverage chips: {avg:.2f}')
+        print(f'Highest chip count: {max_chips}')
+        print('\nPlayer ranking (highest to lowest):')
+
+        # Players sorted numerically by their return on investment (ratio)
+        ranked_stats = self.ranking()
+        for i, stats in enumerate(ranked_stats, 1):
+            print(f'{i}. {stats.name} - Chips: {stats.chips}, Invested: {stats.invested}, Return Rate: {stats.roi:.2f}')
+
+        # Generate the summary image in the background, then wait for it and for any
+        # earlier snapshots; a rendering error surfaces here
+        self.queue_summary_image('table_summary.png', ranked_stats)
+        self.summary_renderer.close()
+        self.summary_renderer = None
+        print('Table image with seating and rankings saved as \'table_summary.png\'')
+
+    def queue_summary_image(self, filename, ranked_stats=None):
+        """
+        Snapshots the table and queues its summary image on the background renderer.
+        Returns:
+            concurrent.futures.Future: Resolves to the file name once the image is saved.
+        """
+        if self.summary_renderer is None:
+            self.summary_renderer = SummaryRenderer()
+        if ranked_stats is None:
+            ranked_stats = self.ranking()
+
+        # Prepare data for the table visualization
+        seat_map = self.seat_map
+        human_seats = [seat_map.seat_of(p) + 1 for p in seat_map.humans]
+        ranked = [(stats.name, stats.chips, stats.invested, stats.roi, not isinstance(stats.player, BotPlayer))
+                  for stats in ranked_stats]
+        return self.summary_renderer.submit(seat_map.by_seat(), human_seats, ranked, filename)
+
+    def seat_players(self):
+        """Returns the players in seat order, the same order play_round deals in."""
+        return list(self.seat_map.players)
+
+    def simulate(self, n_rounds, policy=None, record_every=None, sink=None):
+        """
+        Plays rounds without any input() or printing and collects statistics.
+        The human seats are driven by `policy`; bots, dealer and deck follow the
+        same rules as the interactive game.
+        Args:
+            n_rounds (int): Number of rounds to play.
+            policy (SeatPolicy, optional): Decisions for the human seats. Defaults to SeatPolicy().
+            record_every (int, optional): Chip trajectory sampling interval.
+                Defaults to roughly 1000 samples per run.
+            sink (NullSink, optional): Receives the round events, e.g. an EventSink
+                to log the run. Defaults to none, which costs nothing.
+        Returns:
+            SimulationResult: Per-seat statistics and chip trajectories.
+        Raises:
+            ValueError: If a seat bets on the count and the shoe isn't tracked.
+        """
+        if policy is None:
+            policy = SeatPolicy()
+        self.check_count_betting(policy)
+        if record_every is None:
+            record_every = max(1, n_rounds // 1000)
+        self.simulation = SimulationRun(n_rounds, policy, record_every, self.seat_players())
+        return self.resume_simulation(sink)
+
+    def resume_simulation(self, sink=None):
+        """
+        Plays the remaining rounds of the simulate() run in progress, e.g. one
+        restored from a checkpoint. The result is the same as if the run had
+        never been interrupted.
+        Args:
+            sink (NullSink, optional): Receives the round events of the remaining rounds.
+        Returns:
+            SimulationResult: Per-seat statistics and chip trajectories of the whole run.
+        Raises:
+            ValueError: If no simulation is in progress.
+        """
+        run = self.simulation
+        if run is None:
+            raise ValueError('No simulation is in progress.')
+        seats = self.seat_players()
+        stats = run.stats
+        policy = run.policy
+        record_every = run.record_every
+        for r in range(run.done, run.n_rounds):
+            self._simulate_round(seats, stats, policy, run.initial_chips, sink)
+            if (r + 1) % record_every == 0:
+                run.trajectories[(r + 1) // record_every - 1] = [to_float(p.chips) for p in seats]
+            run.done = r + 1
+            self.rounds_played += 1
+            if self.snapshot_every and self.rounds_played % self.snapshot_every == 0:
+                self.queue_summary_image(f'table_summary_{self.rounds_played:06d}.png')
+            if self.deck.needs_shuffle():
+                self.deck.reshuffle()
+            if self.checkpoint_every and self.rounds_played % self.checkpoint_every == 0:
+                self.save_checkpoint()
+        self.simulation = None
+        return SimulationResult(run.n_rounds, stats, run.trajectories, record_every)
+
+    def _simulate_round(self, seats, stats, policy, initial_chips, sink):
+        """
+        Plays one silent round for simulate() through the same methods as the
+        interactive game, with bots and `policy` deciding and the events going to
+        `sink` (nowhere by default).
+        """
+        saved_sink = self.sink
+        self.sink = NullSink() if sink is None else sink
+        try:
+            self.dealer.reset_hand()
+            count = self.current_count()
+            self._simulate_bets(seats, policy, initial_chips)
+            self.deal_initial_cards()
+
+            def wants_insurance(p):
+                return p.wants_insurance() if isinstance(p, BotPlayer) else policy.wants_insurance(p)
+
+            if self.rules.blackjack_pays is None or not self.check_dealer_natural(wants_insurance):
+                for i, p in enumerate(seats):
+                    if isinstance(p, BotPlayer):
+                        self.play_bot_turn(i, p)
+                    else:
+                        self.play_policy_turn(i, p, policy)
+            self.play_dealer_turn()
+            self._simulate_settle(seats, stats, count)
+        finally:
+            self.sink = saved_sink
+
+    def _simulate_bets(self, seats, policy, initial_chips):
+        """The bets of a simulate() round: `policy` bets for the humans, with the same rebuy rule as the bots."""
+        true_count = 0.0 if self.tracker is None else self.tracker.true_count()
+        for i, p in enumerate(seats):
+            p.reset_hand()
+            if isinstance(p, BotPlayer):
+                self.place_bot_bet(i, p)
+                continue
+            if p.chips == 0:
+                amount = policy.rebuy_amount(p, initial_chips[i])
+                p.chips = amount
+                p.total_chips_added += amount
+                self.sink.rebuy(i, p, amount)
+            amount = policy.place_bet(p, true_count)
+            p.place_bet(amount)
+            self.sink.bet(i, p, amount)
+
+    def _simulate_settle(self, seats, stats, count):
+        """Settles a simulate() round like resolve_results and records it in the seats' SeatStats."""
+        for s, (wagered, paid, busted) in zip(stats, self.settle_seats(seats)):
+            s.record(wagered, paid - wagered, busted, count)
+        self.sink.round_end()
+
+    def checkpoint_state(self):
+        """
+        Captures the session between rounds as plain values: seating, chips, hands,
+        bot and deck RNG states, the global random state Deck shuffles with, running
+        statistics and the simulate() run in progress. Some values are shared with
+        the live game, so write the state out before playing on.
+        Returns:
+            dict: The state, for from_state() or write_checkpoint().
+        """
+        def entry(p, **extra):
+            stats = self.stats.get(p)
+            return dict(extra, name=p.name, chips=p.chips, bet=p.bet, total_chips_added=p.total_chips_added,
+                        hand=_hand_codes(p),
+                        stats=None if stats is None else {k: v for k, v in vars(stats).items() if k != 'player'})
+
+        seat_map = self.seat_map
+        return {
+            'num_decks': self.num_decks,
+            'penetration': self.penetration,
+            'rules': self.rules,
+            'deck': self.deck.getstate(),
+            'random': random.getstate(),
+            'humans': [entry(p, seat=seat_map.seat_of(p) + 1) for p in self.humans()],
+            'bots': [entry(bot, seed=bot.seed, rng=bot.rng.getstate(), strategy=bot.strategy,
+                           betting=bot.betting, rebuy=bot.rebuy) for bot in self.bots],
+            'dealer': (_hand_codes(self.dealer), None if self.dealer.hidden_card is None
+                       else card_code(self.dealer.hidden_card)),
+            'rounds_played': self.rounds_played,
+            'snapshot_every': self.snapshot_every,
+            'checkpoint_every': self.checkpoint_every,
+            'checkpoint_path': self.checkpoint_path,
+            'simulation': self.simulation,
+            'tracked': self.tracker is not None,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuilds a session from checkpoint_state(). Play continues exactly as the
+        original session would have, including the global random state.
+        Returns:
+            GameManager: The restored game (printing to the console).
+        """
+        def restore(p, entry):
+            p.chips = entry['chips']
+            p.total_chips_added = entry['total_chips_added']
+            for code in entry['hand']:
+                p.add_card(CARDS[code])
+            p.bet = entry['bet']
+            if entry['stats'] is not None:
+                stats = PlayerStats.__new__(PlayerStats)
+                vars(stats).update(entry['stats'])
+                stats.player = p
+                game.stats[p] = stats
+
+        main, *others = state['humans']
+        game = cls(main['name'], main['chips'], main['seat'], deck_seed=None,
+                   num_decks=state['num_decks'], penetration=state['penetration'], rules=state.get('rules'))
+        game.deck.setstate(state['deck'])
+        restore(game.player, main)
+        for entry in others:
+            player = Player(entry['name'], entry['chips'])
+            restore(player, entry)
+            game.add_player(player, entry['seat'])
+        bots = []
+        for entry in state['bots']:
+            bot = BotPlayer(entry['name'], entry['chips'], entry['seed'], entry['strategy'],
+                            entry.get('betting'), entry.get('rebuy'))
+            bot.rng.setstate(entry['rng'])
+            restore(bot, entry)
+            bots.append(bot)
+        game.bots = bots
+        hand, hidden = state['dealer']
+        for code in hand:
+            game.dealer.add_card(CARDS[code])
+        game.dealer.hidden_card = None if hidden is None else CARDS[hidden]
+        game.rounds_played = state['rounds_played']
+        game.snapshot_every = state['snapshot_every']
+        game.checkpoint_every = state['checkpoint_every']
+        game.checkpoint_path = state['checkpoint_path']
+        game.simulation = state['simulation']
+        if state.get('tracked'):
+            game.track_shoe()
+        random.setstate(state['random'])
+        return game
+
+    def save_checkpoint(self, filepath=None):
+        """Atomically saves the session to `filepath` (default: checkpoint_path)."""
+        write_checkpoint(self.checkpoint_path if filepath is None else filepath, self.checkpoint_state())
+
+    @classmethod
+    def load_checkpoint(cls, filepath):
+        """
+        Restores a session saved by save_checkpoint(). Continue it with
+        play_session() or, if it was saved during simulate(), resume_simulation().
+        Returns:
+            GameManager: The restored game.
+        """
+        return cls.from_state(read_checkpoint(filepath))
+
+    def _deal(self):
+        """Deals the next card, reshuffling if a long round at a full table empties the deck."""
+        try:
+            return self.deck.deal_card()
+        except ValueError:
+            self.deck.reshuffle()
+            return self.deck.deal_card()
+
+# --- Parallel Monte Carlo ---
+
+def derive_seed(seed, worker):
+    """
+    Derives a deterministic 32-bit sub-seed for one worker from a table seed.
+    Args:
+        seed (int): The original deck or bot seed (None is treated as 0).
+        worker (int): Index of the worker.
+    Returns:
+        int: The worker's seed.
+    """
+    sequence = np.random.SeedSequence(0 if seed is None else seed, spawn_key=(worker,))
+    return int(sequence.generate_state(1)[0])
+
+def _simulate_shard(task):
+    """Worker entry point: rebuilds the table from its config and simulates one shard."""
+    config, worker, n_rounds, policy = task
+    game = GameManager(config['player_name'], config['player_chips'], config['player_sit'],
+                       deck_seed=derive_seed(config['deck_seed'], worker),
+                       num_decks=config['num_decks'], penetration=config['penetration'], rules=config['rules'])
+    game.bots = [BotPlayer(name, chips, derive_seed(seed, worker), strategy, betting, rebuy)
+                 for name, chips, seed, strategy, betting, rebuy in config['bots']]
+    for name, chips, seat in config['other_humans']:
+        game.add_player(Player(name, chips), seat)
+    if config['tracked']:
+        game.track_shoe()
+    # Only the merged statistics travel back to the parent, never per-round data
+    return game.simulate(n_rounds, policy, record_every=max(1, n_rounds)).seats
+
+def run_parallel_simulation(game, n_rounds, workers=None, policy=None):
+    """
+    Shards a headless simulation of `game`'s table across worker processes.
+    Every worker rebuilds the table with sub-seeds derived from the deck seed and
+    each bot's seed, so a given seed and worker count always gives bit-identical results.
+    Args:
+        game (GameManager): Template table (players, bots, deck seed and shoe settings).
+        n_rounds (int): Total number of rounds over all workers.
+        workers (int, optional): Number of processes. Defaults to the CPU count.
+        policy (SeatPolicy, optional): Decisions for the human seats.
+    Returns:
+        SimulationResult: Statistics merged over all workers (no trajectories).
+    Raises:
+        ValueError: If a seat bets on the count and the shoe isn't tracked.
+    """
+    game.check_count_betting(policy)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    config = {
+        'player_name': game.player.name,
+        'player_chips': game.player.chips,
+        'player_sit': game.player_sit,
+        'deck_seed': game.deck.seed,
+        'num_decks': game.num_decks,
+        'penetration': game.penetration,
+        'rules': game.rules,
+        'bots': [(bot.name, bot.chips, bot.seed, bot.strategy, bot.betting, bot.rebuy) for bot in game.bots],
+        'other_humans': [(p.name, p.chips, seat) for p, seat in game.other_humans],
+        'tracked': game.tracker is not None,
+    }
+    # Spread the rounds as evenly as possible; the split depends only on n_rounds and workers
+    tasks = [(config, w, n_rounds // workers + (1 if w < n_rounds % workers else 0), policy)
+             for w in range(workers)]
+    if workers == 1:
+        shards = [_simulate_shard(tasks[0])]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            shards = pool.map(_simulate_shard, tasks)
+
+    # Merge in worker order so floating point sums are always done the same way
+    merged = [SeatStats(s.name) for s in shards[0]]
+    for shard in shards:
+        for total, seat in zip(merged, shard):
+            total.merge(seat)
+    return SimulationResult(n_rounds, merged)
+
+# --- Multi-Table Server ---
+
+class QueueTransport:
+    """
+    In-process connection between a table and its player, made of two asyncio queues.
+    The table side uses send()/receive(); the player side next_message()/reply().
+    """
+    def __init__(self):
+        self.to_client = asyncio.Queue()
+        self.to_table = asyncio.Queue()
+
+    def send(self, message):
+        """Table side: sends a message (a dict) to the player."""
+        self.to_client.put_nowait(message)
+
+    async def receive(self):
+        """Table side: waits for the player's next action, None once they disconnect."""
+        return await self.to_table.get()
+
+    async def next_message(self):
+        """Player side: waits for the next message from the table."""
+        return await self.to_client.get()
+
+    def reply(self, action):
+        """Player side: sends an action string to the table."""
+        self.to_table.put_nowait(action)
+
+    def close(self):
+        """Table side: tells the player the connection is over."""
+        self.to_client.put_nowait(None)
+
+class StreamTransport:
+    """
+    Socket connection (TCP or Unix) between a table and a remote player.
+    The table sends one JSON object per line and the player answers with plain text lines.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, message):
+        self.writer.write((json.dumps(message) + '\n').encode())
+
+    async def receive(self):
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            return None
+        return line.decode().strip()
+
+    async def next_message(self):
+        line = await self.reader.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def reply(self, action):
+        self.writer.write((action + '\n').encode())
+
+    def close(self):
+        self.writer.close()
+
+class TransportSink(NullSink):
+    """Forwards what a player at the table would see to their transport."""
+    def __init__(self, transport):
+        self.transport = transport
+
+    def show_hand(self, seat, player):
+        self.transport.send({'type': 'hand', 'seat': seat, 'name': player.name,
+                             'cards': [str(c) for c in player.hand.cards], 'value': player.hand.get_value()})
+
+    def dealer_shows(self, card):
+        self.transport.send({'type': 'dealer_shows', 'card': str(card)})
+
+    def hit(self, seat, player, card):
+        self.transport.send({'type': 'hit', 'seat': seat, 'name': player.name, 'card': str(card),
+                             'value': player.hand.get_value()})
+
+    def result(self, seat, player, value, outcome, payout):
+        self.transport.send({'type': 'result', 'seat': seat, 'name': player.name, 'value': value,
+                             'outcome': outcome, 'chips': player.chips})
+
+class TableServer:
+    """
+    Hosts many blackjack tables in one asyncio event loop.
+    Every connected player gets their own GameManager-driven table with fresh copies
+    of the server's bots; the table awaits the player's bets and moves through a
+    transport while the bots play instantly. An action that doesn't arrive within
+    `action_timeout` seconds is replaced by a default: standing, or leaving the table
+    when a bet or rebuy is due.
+
+    Protocol: the table sends messages {'type': 'bet' | 'move' | 'rebuy' | 'hand' | 'hit' |
+    'dealer_shows' | 'result' | 'timeout' | 'error' | 'bye', ...}. 'bet', 'move' and 'rebuy'
+    expect an answer: a number of chips, 'hit'/'stand', or 'leave'. Over sockets the first
+    line a client sends is its name.
+    Args:
+        bots (list of tuple): (name, chips, seed) of the bots seated at every table.
+        player_chips (int): Starting chips of a connecting player.
+        player_sit (int): The player's seat (1-based).
+        action_timeout (float): Seconds a table waits for a player's action.
+        num_decks (int, optional): Deal from a Shoe of this many decks.
+        seed (int, optional): Base deck seed; table n uses derive_seed(seed, n).
+    """
+    def __init__(self, bots=(), player_chips=100, player_sit=1, action_timeout=30.0,
+                 num_decks=None, seed=None):
+        self.bots = list(bots)
+        self.player_chips = player_chips
+        self.player_sit = player_sit
+        self.action_timeout = action_timeout
+        self.num_decks = num_decks
+        self.seed = seed
+        self.tables_opened = 0
+        self.active_tables = 0
+
+    def new_table(self, player_name, transport):
+        """Creates the GameManager of a newly connected player."""
+        table_id = self.tables_opened
+        self.tables_opened += 1
+        game = GameManager(player_name, self.player_chips, min(self.player_sit, len(self.bots) + 1),
+                           deck_seed=derive_seed(self.seed, table_id), num_decks=self.num_decks)
+        game.bots = [BotPlayer(name, chips, derive_seed(seed, table_id)) for name, chips, seed in self.bots]
+        game.sink = TransportSink(transport)
+        return game
+
+    async def ask(self, transport, message, default):
+        """Sends a prompt and waits for the answer, using `default` on timeout."""
+        transport.send(message)
+        try:
+            return await asyncio.wait_for(transport.receive(), self.action_timeout)
+        except asyncio.TimeoutError:
+            transport.send({'type': 'timeout', 'default': default})
+            return default
+
+    async def ask_amount(self, transport, message, low, high):
+        """Asks for a chip amount between low and high; returns None if the player leaves."""
+        while True:
+            answer = await self.ask(transport, message, 'leave')
+            if answer is None or answer == 'leave':
+                return None
+            try:
+                amount = int(answer)
+            except ValueError:
+                amount = None
+            if amount is not None and low <= amount <= high:
+                return amount
+            transport.send({'type': 'error', 'message': f'Please enter a number between {low} and {high}.'})
+
+    async def play_table(self, transport, player_name, max_rounds=None):
+        """
+        Runs one table until its player leaves, disconnects or plays max_rounds rounds.
+        Returns:
+            GameManager: The finished table.
+        """
+        game = self.new_table(player_name, transport)
+        player = game.player
+        self.active_tables += 1
+        try:
+            while max_rounds is None or game.rounds_played < max_rounds:
+                if player.chips == 0:
+                    amount = await self.ask_amount(transport, {'type': 'rebuy', 'min': 100, 'max': 1000}, 100, 1000)
+                    if amount is None:
+                        break
+                    player.chips = amount
+                    player.total_chips_added += amount
+
+                game.reset_hands()
+                amount = await self.ask_amount(transport, {'type': 'bet', 'chips': player.chips}, 1, player.chips)
+                if amount is None:
+                    break
+                player.place_bet(amount)
+                game.collect_bot_bets()
+                game.deal_initial_cards()
+
+                upcard = game.dealer.hand.cards[0]
+                for seat, p in enumerate(game.seat_players()):
+                    if p is not player:
+                        game.play_bot_turn(seat, p)
+                        continue
+                    while not player.has_bust():
+                        move = await self.ask(transport, {'type': 'move', 'cards': [str(c) for c in player.hand.cards],
+                                                          'value': player.hand.get_value(), 'dealer': str(upcard)},
+                                              'stand')
+                        if move is None:
+                            return game
+                        if move == 'hit':
+                            game.hit(seat, player)
+                        elif move == 'stand':
+                            break
+                        else:
+                            transport.send({'type': 'error', 'message': 'Please answer hit or stand.'})
+
+                game.play_dealer_turn()
+                game.resolve_results()
+                if game.deck.needs_shuffle():
+                    game.deck.reshuffle()
+            transport.send({'type': 'bye', 'chips': player.chips})
+            return game
+        finally:
+            self.active_tables -= 1
+            transport.close()
+
+    async def _handle_connection(self, reader, writer):
+        """Serves one socket client: reads its name, then runs its table."""
+        name = (await reader.readline()).decode().strip() or 'Player'
+        await self.play_table(StreamTransport(reader, writer), name)
+
+    async def serve(self, host='127.0.0.1', port=0, path=None):
+        """
+        Starts accepting players over TCP, or over a Unix socket when `path` is given.
+        Returns:
+            asyncio.Server: The running server (use its sockets to find a chosen port).
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self._handle_connection, path)
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+async def _load_client(transport, rounds, latencies):
+    """
+    A scripted player for the load generator: bets 1 chip, hits below 17, and records
+    the time from each of its actions to the table's next prompt.
+    """
+    sent_at = None
+    played = 0
+    while True:
+        message = await transport.next_message()
+        if message is None or message['type'] == 'bye':
+            return
+        kind = message['type']
+        if kind not in ('bet', 'move', 'rebuy'):
+            continue
+        now = time.perf_counter()
+        if sent_at is not None:
+            latencies.append(now - sent_at)
+        if kind == 'bet':
+            action = 'leave' if played == rounds else '1'
+            played += 1
+        elif kind == 'move':
+            action = 'hit' if message['value'] < 17 else 'stand'
+        else:
+            action = '100'
+        sent_at = time.perf_counter()
+        transport.reply(action)
+
+async def _run_load(server, n_tables, rounds, use_sockets):
+    """Connects n_tables scripted players to the server and waits for all of them."""
+    latencies = []
+    tasks = []
+    tcp_server = None
+    if use_sockets:
+        tcp_server = await server.serve()
+        port = tcp_server.sockets[0].getsockname()[1]
+        for n in range(n_tables):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            client = StreamTransport(reader, writer)
+            client.reply(f'Load{n}')
+            tasks.append(asyncio.create_task(_load_client(client, rounds, latencies)))
+    else:
+        for n in range(n_tables):
+            transport = QueueTransport()
+            tasks.append(asyncio.create_task(server.play_table(transport, f'Load{n}')))
+            tasks.append(asyncio.create_task(_load_client(transport, rounds, latencies)))
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    if tcp_server is not None:
+        tcp_server.close()
+        await tcp_server.wait_closed()
+    return latencies, elapsed
+
+def run_load_test(n_tables=100, rounds=20, use_sockets=False, bots=(('Bot_A', 120, 11), ('Bot_B', 100, 22)), seed=0):
+    """
+    Local load generator: plays `rounds` rounds at each of `n_tables` concurrent tables.
+    Args:
+        n_tables (int): Number of simultaneous tables (one scripted player each).
+        rounds (int): Rounds every player plays before leaving.
+        use_sockets (bool): Connect over local TCP instead of in-process queues.
+        bots (iterable): (name, chips, seed) of the bots at every table.
+        seed (int): Base deck seed.
+    Returns:
+        dict: actions, seconds, actions_per_sec, p50_ms and p99_ms action latency.
+    """
+    server = TableServer(bots, player_chips=100, seed=seed)
+    latencies, elapsed = asyncio.run(_run_load(server, n_tables, rounds, use_sockets))
+    lat = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'tables': n_tables,
+        'actions': len(latencies),
+        'seconds': elapsed,
+        'actions_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': float(np.percentile(lat, 50)),
+        'p99_ms': float(np.percentile(lat, 99)),
+    }
+
+# --- Benchmarks ---
+
+BENCH_BASELINE = 'benchmark_baseline.json'
+BENCH_SEATS = (1, 3, 7)
+# Results are only comparable when these 'meta' entries match
+BENCH_COMPARABLE = ('python', 'numpy', 'machine', 'processor', 'quick')
+
+def _bench_table(n_seats, num_decks=None):
+    """Creates a benchmark table: one human in seat 1 and n_seats - 1 bots."""
+    game = GameManager('Bench', 1000, 1, deck_seed=1, num_decks=num_decks)
+    game.bots = [BotPlayer(f'Bot{i}', 1000, i) for i in range(1, n_seats)]
+    return game
+
+def bench_get_value(n_hands=1000, number=100, repeat=7):
+    """Returns the time of one Hand.get_value() call in nanoseconds, one per repeat, over hands of 2 to 5 cards."""
+    rng = random.Random(1)
+    hands = []
+    for _ in range(n_hands):
+        hand = Hand()
+        for card in rng.sample(CARDS, rng.randint(2, 5)):
+            hand.add_card(card)
+        hands.append(hand)
+
+    def run():
+        for hand in hands:
+            hand.get_value()
+    return [elapsed / (number * n_hands) * 1e9 for elapsed in timeit.Timer(run).repeat(repeat, number)]
+
+def bench_deal_card(deck, shoes=500, repeat=7):
+    """
+    Returns the time of one deal_card() call in nanoseconds, one per repeat,
+    dealing `deck` down to its reshuffle point `shoes` times as a table does.
+    """
+    times = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        dealt = 0
+        for _ in range(shoes):
+            deck.reshuffle()
+            remaining = deck.cards_remaining()
+            start = time.perf_counter()
+            while not deck.needs_shuffle():
+                deck.deal_card()
+            elapsed += time.perf_counter() - start
+            dealt += remaining - deck.cards_remaining()
+        times.append(elapsed / dealt * 1e9)
+    return times
+
+def bench_shuffle(deck, number=2000, repeat=7):
+    """Returns the time of one reshuffle() of `deck` in nanoseconds, one per repeat."""
+    return [elapsed / number * 1e9 for elapsed in timeit.Timer(deck.reshuffle).repeat(repeat, number)]
+
+def bench_rounds(n_seats, rounds=3000, output=False, repeat=5):
+    """
+    Returns rounds per second of the interactive round cycle, one per repeat: bets,
+    play_round() and resolve_results(), with the human standing on every hand.
+    Args:
+        n_seats (int): Seats at the table, the human included.
+        rounds (int): Rounds per timing.
+        output (bool): Render to the console (sent to os.devnull) instead of a NullSink.
+        repeat (int): Timings to take.
+    """
+    rates = []
+    saved_input = builtins.input
+    builtins.input = lambda prompt='': 'stand'
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(repeat):
+                game = _bench_table(n_seats)
+                game.sink = ConsoleRenderer(game.player) if output else NullSink()
+                player = game.player
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    game.reset_hands()
+                    if player.chips == 0:
+                        player.chips = 1000
+                    player.place_bet(min(10, player.chips))
+                    game.collect_bot_bets()
+                    game.play_round()
+                    game.resolve_results()
+                    if game.deck.needs_shuffle():
+                        game.deck.reshuffle()
+                rates.append(rounds / (time.perf_counter() - start))
+    finally:
+        builtins.input = saved_input
+    return rates
+
+def bench_simulate(n_seats, rounds=5000, repeat=5):
+    """Returns rounds per second of the headless GameManager.simulate(), one per repeat."""
+    rates = []
+    for _ in range(repeat):
+        game = _bench_table(n_seats)
+        start = time.perf_counter()
+        game.simulate(rounds)
+        rates.append(rounds / (time.perf_counter() - start))
+    return rates
+
+def run_benchmarks(quick=False, passes=7):
+    """
+    Runs the micro- and macro-benchmarks of the engine.
+    Micro-benchmarks time Hand.get_value, deal_card and reshuffle of a Deck and a
+    6-deck Shoe in nanoseconds per call (lower is better). Macro-benchmarks measure
+    rounds per second at 1, 3 and 7 seats (higher is better), through the round
+    cycle with and without console output and through simulate().
+    The suite runs `passes` times over, timing every benchmark once per pass, so a
+    busy spell of the machine spreads over all benchmarks instead of skewing the
+    ones that ran during it. A benchmark's value is the median of its timings and
+    its noise their median absolute deviation relative to it.
+    The global random state is restored afterwards.
+    Args:
+        quick (bool): Run fewer iterations, for a fast smoke check.
+        passes (int): Timings taken of every benchmark.
+    Returns:
+        dict: 'meta' (interpreter and machine) and 'results', mapping each
+            benchmark name to its 'value', 'noise' and 'unit' ('ns' or 'rounds/s').
+    """
+    scale = 10 if quick else 1
+    saved_random = random.getstate()
+
+    deck, shoe = Deck(seed=1), Shoe(6, seed=1)
+    # name: (unit, timing of one repeat)
+    benches = {
+        'hand_get_value': ('ns', lambda: bench_get_value(number=100 // scale, repeat=1)),
+        'deck_deal_card': ('ns', lambda: bench_deal_card(deck, shoes=500 // scale, repeat=1)),
+        'deck_shuffle': ('ns', lambda: bench_shuffle(deck, number=2000 // scale, repeat=1)),
+        'shoe_deal_card': ('ns', lambda: bench_deal_card(shoe, shoes=500 // scale, repeat=1)),
+        'shoe_shuffle': ('ns', lambda: bench_shuffle(shoe, number=2000 // scale, repeat=1)),
+    }
+    for n_seats in BENCH_SEATS:
+        benches[f'round_{n_seats}_seats'] = (
+            'rounds/s', lambda n=n_seats: bench_rounds(n, 3000 // scale, repeat=1))
+        benches[f'round_{n_seats}_seats_console'] = (
+            'rounds/s', lambda n=n_seats: bench_rounds(n, 3000 // scale, output=True, repeat=1))
+        benches[f'simulate_{n_seats}_seats'] = (
+            'rounds/s', lambda n=n_seats: bench_simulate(n, 5000 // scale, repeat=1))
+    samples = {name: [] for name in benches}
+    try:
+        for _ in range(passes):
+            for name, (unit, bench) in benches.items():
+                samples[name].extend(bench())
+    finally:
+        random.setstate(saved_random)
+    results = {}
+    for name, (unit, bench) in benches.items():
+        timings = np.asarray(samples[name])
+        value = float(np.median(timings))
+        results[name] = {'value': value, 'noise': float(np.median(np.abs(timings - value)) / value), 'unit': unit}
+    meta = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'quick': quick,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    return {'meta': meta, 'results': results}
+
+def compare_benchmarks(current, baseline, threshold=0.10):
+    """
+    Compares benchmark results against a baseline taken under the same conditions.
+    A benchmark regressed when its slowdown is beyond the threshold plus the noise
+    of both runs, so a jittery timing needs a larger slowdown to count.
+    Args:
+        current (dict): Results of run_benchmarks().
+        baseline (dict): Earlier results of run_benchmarks().
+        threshold (float): Allowed slowdown, e.g. 0.10 for 10 %.
+    Returns:
+        list of dict: One entry per benchmark present in both, with 'name',
+            'baseline', 'current', 'unit', 'slowdown' (relative, positive when
+            slower), 'noise' and 'regressed'.
+    Raises:
+        ValueError: If the runs differ in any BENCH_COMPARABLE entry of their 'meta',
+            e.g. a --quick run against a full baseline or another interpreter.
+    """
+    differ = [key for key in BENCH_COMPARABLE
+              if current['meta'].get(key) != baseline.get('meta', {}).get(key)]
+    if differ:
+        raise ValueError('Results are not comparable with the baseline, they differ in: '
+                         + ', '.join(f'{key} ({baseline.get("meta", {}).get(key)!r} vs {current["meta"].get(key)!r})'
+                                     for key in differ))
+    report = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        if result['unit'] == 'rounds/s':
+            slowdown = base['value'] / result['value'] - 1
+        else:
+            slowdown = result['value'] / base['value'] - 1
+        noise = result.get('noise', 0.0) + base.get('noise', 0.0)
+        report.append({'name': name, 'baseline': base['value'], 'current': result['value'],
+                       'unit': result['unit'], 'slowdown': slowdown, 'noise': noise,
+                       'regressed': slowdown > threshold + noise})
+    return report
+
+def benchmark_main(argv):
+    """
+    Command line of the benchmarks: python 324042373_212304836.py bench [options].
+    Returns:
+        int: Exit status, 1 if any benchmark regressed past the threshold and its noise.
+    """
+    parser = argparse.ArgumentParser(prog='324042373_212304836.py bench', description='Blackjack engine benchmarks')
+    parser.add_argument('--quick', action='store_true', help='fewer iterations, for a smoke check')
+    parser.add_argument('--baseline', default=BENCH_BASELINE, help='baseline results file')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown (default 0.10)')
+    parser.add_argument('--output', help='also write the results as JSON to this file')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.quick)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(json.dumps(results, indent=2))
+        return 0
+    if not os.path.exists(args.baseline):
+        print(json.dumps(results, indent=2))
+        print(f'No baseline at {args.baseline}; run with --save-baseline to store one.')
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    try:
+        report = compare_benchmarks(results, baseline, args.threshold)
+    except ValueError as e:
+        print(json.dumps(results, indent=2))
+        print(f'{e}; comparison skipped.')
+        return 0
+    print(json.dumps({'results': results, 'comparison': report}, indent=2))
+    regressed = [entry['name'] for entry in report if entry['regressed']]
+    if regressed:
+        print(f'Regressions over {args.threshold:.0%} plus noise: {", ".join(regressed)}')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['bench']:
+        sys.exit(benchmark_main(sys.argv[2:]))
+
+    # --- Game Setup ---
+    # This block runs when the script is executed directly.
+    # It collects initial information from the user to set up the game.
+    name = input('Enter your name: ')
+    initial_chips = get_valid_int('Enter the amount of chips: ', min_val=100, max_val=1000)
+
+    # Instantiate the main game controller; the seat is chosen once the bots are known
+    game = GameManager(name, initial_chips, 1, deck_seed=0)
+
+    # Load bot players from an external file
+    game.load_players_from_file('bots.txt')
+
+    # The table has a seat for every bot plus the player's own
+    num_seats = min(len(game.bots) + 1, MAX_SEATS)
+    game.player_sit = get_valid_int(f'Where would you like to sit? (Choose a seat number from 1 to {num_seats}): ',
+                                    min_val=1, max_val=num_seats)
 
     # Start the game
     game.start_game()
\ No newline at end of file
@@ -1,6 +1,883 @@
+import heapq
+import os
+import struct
 import sys
+import warnings
+import numpy as np
 sys.setrecursionlimit(10000)
 
+# binary maps: a header (magic, rows, columns) followed by the walls bit-packed
+# row by row, eight cells per byte with the first column in the high bit and each
+# row padded to whole bytes. the rows can be memory-mapped straight from the file
+GRID_MAGIC = b'GRIDMAP1'
+GRID_HEADER = struct.Struct('<8sII')
+GRID_CHUNK_ROWS = 1024  # text rows parsed per batch
+
+# an occupancy map stored as bits: a set bit is a wall (any non-zero value in
+# the text format), a clear bit a free cell. bits is a (rows, (cols + 7) // 8)
+# uint8 array, either in memory or memory-mapped from a binary map file
+class Grid:
+    __slots__ = ('bits', 'rows', 'cols')
+
+    def __init__(self, bits, rows, cols):
+        self.bits = bits
+        self.rows = rows
+        self.cols = cols
+
+    # builds a grid from a boolean or numeric array, non-zero cells being walls
+    @classmethod
+    def from_walls(cls, walls):
+        walls = np.asarray(walls)
+        rows, cols = walls.shape
+        return cls(np.packbits(walls != 0, axis=1), rows, cols)
+
+    # builds a grid from a map in the list of rows form read_map returns
+    @classmethod
+    def from_rows(cls, rows):
+        if not rows:
+            return cls(np.zeros((0, 0), dtype=np.uint8), 0, 0)
+        return cls.from_walls(np.array(rows))
+
+    # returns the walls as a (rows, cols) uint8 array, 1 for a wall
+    def walls(self):
+        return np.unpackbits(self.bits, axis=1, count=self.cols)
+
+    # returns the map as a list of rows of 0 (free) and 1 (wall)
+    def to_rows(self):
+        return self.walls().tolist()
+
+    # checks if a (row, col) cell is on the map and free
+    def is_free(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols and not (self.bits[r, c >> 3] >> (7 - (c & 7))) & 1
+
+    # bytes the grid's bits take up
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+# a set of visited cells stored as one bit per cell. it has the add, remove and
+# in of the set of (row, col) tuples the searches used, at 1/8 byte per cell
+class Bitmap:
+    __slots__ = ('bits', 'cols')
+
+    def __init__(self, rows, cols):
+        self.bits = bytearray((rows * cols + 7) // 8)
+        self.cols = cols
+
+    def add(self, cell):
+        i = cell[0] * self.cols + cell[1]
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def remove(self, cell):
+        i = cell[0] * self.cols + cell[1]
+        self.bits[i >> 3] &= ~(1 << (i & 7))
+
+    def __contains__(self, cell):
+        i = cell[0] * self.cols + cell[1]
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+# checks if a coordinate is on the grid, free and not visited, like is_valid
+# but against a Grid and a Bitmap (or any set of (row, col) tuples)
+def grid_is_valid(grid, x, y, visited):
+    return grid.is_free(x, y) and (x, y) not in visited
+
+# parses the space separated text format a batch of lines at a time, so only one
+# batch of numbers is ever held unpacked. blank lines are skipped. raises
+# ValueError if a row's length differs from the first row's or a value isn't a number
+def parse_grid_text(lines):
+    chunks = []
+    batch = []
+    line_nos = []
+    cols = None
+    rows = 0
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        if cols is None:
+            cols = len(line.split())
+        batch.append(line)
+        line_nos.append(line_no)
+        if len(batch) == GRID_CHUNK_ROWS:
+            chunks.append(_pack_text_rows(batch, line_nos, cols))
+            rows += len(batch)
+            batch = []
+            line_nos = []
+    if batch:
+        chunks.append(_pack_text_rows(batch, line_nos, cols))
+        rows += len(batch)
+    if not chunks:
+        return Grid(np.zeros((0, 0), dtype=np.uint8), 0, 0)
+    return Grid(np.concatenate(chunks), rows, cols)
+
+# packs a batch of text rows with one C-level parse. only when the count of
+# numbers is off are the lines split one by one to report the faulty one
+def _pack_text_rows(batch, line_nos, cols):
+    text = b' '.join(batch) if isinstance(batch[0], bytes) else ' '.join(batch)
+    try:
+        # older numpy versions warn and stop at a bad value, newer ones raise
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            values = np.fromstring(text, dtype=np.int64, sep=' ')
+    except ValueError:
+        values = None
+    if values is None or len(values) != len(batch) * cols:
+        for line_no, line in zip(line_nos, batch):
+            tokens = line.split()
+            if len(tokens) != cols:
+                raise ValueError(f'line {line_no}: {len(tokens)} values, expected {cols}')
+            for token in tokens:
+                try:
+                    int(token)
+                except ValueError:
+                    if isinstance(token, bytes):
+                        token = token.decode(errors='replace')
+                    raise ValueError(f'line {line_no}: {token!r} is not a number') from None
+        raise ValueError(f'lines {line_nos[0]}-{line_nos[-1]}: not a map')
+    return np.packbits(values.reshape(len(batch), cols) != 0, axis=1)
+
+# writes a grid in the binary format, atomically: into a temporary file next
+# to the target that is then renamed over it
+def write_grid(filename, grid):
+    tmp = f'{filename}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(GRID_HEADER.pack(GRID_MAGIC, grid.rows, grid.cols))
+        f.write(np.ascontiguousarray(grid.bits).tobytes())
+    os.replace(tmp, filename)
+
+# reads a map in either format, told apart by the magic. binary maps are
+# memory-mapped, so loading costs nothing until cells are read
+def read_grid(filename):
+    with open(filename, 'rb') as f:
+        header = f.read(GRID_HEADER.size)
+        if not header.startswith(GRID_MAGIC):
+            f.seek(0)
+            return parse_grid_text(f)
+    _, rows, cols = GRID_HEADER.unpack(header)
+    if not rows or not cols:
+        return Grid(np.zeros((rows, (cols + 7) // 8), dtype=np.uint8), rows, cols)
+    bits = np.memmap(filename, dtype=np.uint8, mode='r', offset=GRID_HEADER.size, shape=(rows, (cols + 7) // 8))
+    return Grid(bits, rows, cols)
+
+
+# the moves in the order the searches prefer them: up, right, down, left.
+# of all shortest paths the engine returns the one that takes the first
+# possible move at every step, the same path the old exhaustive dfs kept
+MOVES = ((-1, 0), (0, 1), (1, 0), (0, -1))
+# only bfs stays well under a second between far corners of an open 1000x1000
+# map (about 0.4-0.6s); there astar and bidirectional both visit every cell with more
+# work per cell (about 1.2-1.6s and 0.6-0.8s). they pay off on maps where they
+# can stop early, e.g. ends on the same open row or a walled-off end
+SEARCH_METHODS = ('bfs', 'astar', 'bidirectional')
+
+# packs a map (a Grid or a list of rows, 0 for a free cell) into a flat bytearray with a
+# border of walls around it, so a neighbour is just an index offset and never
+# needs a bounds check. returns the cells (1 for free) and the padded row width
+def pack_grid(grid):
+    if isinstance(grid, Grid):
+        cells = np.zeros((grid.rows + 2, grid.cols + 2), dtype=np.uint8)
+        cells[1:-1, 1:-1] = grid.walls() ^ 1
+        return bytearray(cells.tobytes()), grid.cols + 2
+    rows = len(grid)
+    width = max((len(row) for row in grid), default=0) + 2
+    cells = bytearray(width * (rows + 2))
+    for r, row in enumerate(grid):
+        base = (r + 1) * width + 1
+        cells[base:base + len(row)] = bytes(value == 0 for value in row)
+    return cells, width
+
+# returns the packed index of a (row, col) point, or -1 if it is off the map or a wall
+def cell_index(cells, width, point):
+    r, c = point
+    if r < 0 or c < 0 or c >= width - 2:
+        return -1
+    i = (r + 1) * width + c + 1
+    return i if i < len(cells) and cells[i] else -1
+
+# turns a packed index back into a (row, col) point
+def cell_point(width, i):
+    r, c = divmod(i, width)
+    return (r - 1, c - 1)
+
+# walks a shortest path of the given length from the start, taking at every step
+# the first move (up, right, down, left) whose cell on_path(cell, step) accepts
+def walk_path(width, start, length, on_path):
+    offsets = (-width, 1, width, -1)
+    path = [cell_point(width, start)]
+    u = start
+    for step in range(1, length + 1):
+        for offset in offsets:
+            if on_path(u + offset, step):
+                u += offset
+                break
+        path.append(cell_point(width, u))
+    return path
+
+# breadth first search from the end until the start is reached; every cell found
+# so far has its exact distance to the end, which is all the walk needs
+def bfs_path(cells, width, start, end):
+    offsets = (-width, 1, width, -1)
+    dist = [-1] * len(cells)
+    dist[end] = 0
+    frontier = [end]
+    d = 0
+    while frontier and dist[start] < 0:
+        d += 1
+        next_frontier = []
+        append = next_frontier.append
+        for u in frontier:
+            for offset in offsets:
+                v = u + offset
+                if cells[v] and dist[v] < 0:
+                    dist[v] = d
+                    append(v)
+        frontier = next_frontier
+    length = dist[start]
+    if length < 0:
+        return []
+    return walk_path(width, start, length, lambda v, step: dist[v] == length - step)
+
+# a* from the end towards the start with the manhattan distance to the start as
+# heuristic. a step changes f by 0 (towards the start) or 2, so the open cells sit
+# in two lists, this f and the next, instead of a heap; within a list the newest
+# (deepest) cell goes first. it keeps expanding until every cell with f <= the path
+# length is closed, so all cells of all shortest paths have exact distances for the
+# walk. on an open map the heuristic is exact and that is every cell, so there a*
+# does the work of bfs with more bookkeeping; it wins where walls are few between
+# the ends but the map around them is large
+def astar_path(cells, width, start, end):
+    size = len(cells)
+    sr, sc = divmod(start, width)
+    # size stands for a cell not reached yet; a closed cell is never improved
+    dist = [size] * size
+    closed = bytearray(size)
+    dist[end] = 0
+    er, ec = divmod(end, width)
+    f = abs(er - sr) + abs(ec - sc)
+    bucket = [end]
+    length = -1
+    while bucket and (length < 0 or f <= length):
+        later = []
+        while bucket:
+            u = bucket.pop()
+            # a cell whose distance improved was pushed again into this list
+            if closed[u]:
+                continue
+            closed[u] = 1
+            if u == start:
+                length = dist[u]
+            g = dist[u] + 1
+            ur, uc = divmod(u, width)
+            for offset, towards in ((-width, ur > sr), (1, uc < sc), (width, ur < sr), (-1, uc > sc)):
+                v = u + offset
+                if g < dist[v] and cells[v]:
+                    dist[v] = g
+                    if towards:
+                        bucket.append(v)
+                    else:
+                        later.append(v)
+        bucket = later
+        f += 2
+    if length < 0:
+        return []
+    return walk_path(width, start, length, lambda v, step: closed[v] and dist[v] == length - step)
+
+# expands one breadth first level of a bidirectional search. returns the new
+# frontier and the shortest start-to-end length through a cell the other side
+# has already reached (-1 if the searches haven't met)
+def expand_level(cells, offsets, frontier, dist, other, d):
+    next_frontier = []
+    best = -1
+    for u in frontier:
+        for offset in offsets:
+            v = u + offset
+            if cells[v] and dist[v] < 0:
+                dist[v] = d
+                next_frontier.append(v)
+                if other[v] >= 0 and (best < 0 or d + other[v] < best):
+                    best = d + other[v]
+    return next_frontier, best
+
+# breadth first searches from both ends, always growing the smaller frontier,
+# until they meet. the cells of the start side that lie on a shortest path are
+# then marked level by level back from the meeting cells, and the end side
+# knows its exact distances, so the walk can follow either
+def bidirectional_path(cells, width, start, end):
+    offsets = (-width, 1, width, -1)
+    size = len(cells)
+    from_start = [-1] * size
+    from_end = [-1] * size
+    from_start[start] = 0
+    from_end[end] = 0
+    if start == end:
+        return [cell_point(width, start)]
+    levels = [[start]]
+    end_frontier = [end]
+    d_start = d_end = 0
+    length = -1
+    while length < 0 and levels[-1] and end_frontier:
+        if len(levels[-1]) <= len(end_frontier):
+            d_start += 1
+            frontier, length = expand_level(cells, offsets, levels[-1], from_start, from_end, d_start)
+            levels.append(frontier)
+        else:
+            d_end += 1
+            end_frontier, length = expand_level(cells, offsets, end_frontier, from_end, from_start, d_end)
+    if length < 0:
+        return []
+    on_path = bytearray(size)
+    for level in levels:
+        for u in level:
+            if from_end[u] >= 0 and from_start[u] + from_end[u] == length:
+                on_path[u] = 1
+    for level in reversed(levels[:-1]):
+        for u in level:
+            if not on_path[u]:
+                d = from_start[u] + 1
+                for offset in offsets:
+                    v = u + offset
+                    if on_path[v] and from_start[v] == d:
+                        on_path[u] = 1
+                        break
+    return walk_path(width, start, length,
+                     lambda v, step: (on_path[v] and from_start[v] == step) or
+                                     (from_end[v] >= 0 and from_end[v] == length - step))
+
+# finds a shortest path between two (row, col) points of a map, moving up,
+# right, down or left through cells that are 0. method is 'bfs', 'astar' or
+# 'bidirectional'; they all return the same path. returns the path as a list
+# of points from start to end, or an empty list if there is none
+def shortest_path(grid, start, end, method='bfs'):
+    if method not in SEARCH_METHODS:
+        raise ValueError(f'unknown search method {method!r}, expected one of {SEARCH_METHODS}')
+    cells, width = pack_grid(grid)
+    s = cell_index(cells, width, start)
+    t = cell_index(cells, width, end)
+    if s < 0 or t < 0:
+        return []
+    if method == 'astar':
+        return astar_path(cells, width, s, t)
+    if method == 'bidirectional':
+        return bidirectional_path(cells, width, s, t)
+    return bfs_path(cells, width, s, t)
+
+
+# grows a breadth first wavefront from the sources with numpy: each level's
+# frontier is an array of cell indices, so one level costs a handful of array
+# operations over the frontier and never a pass over the whole map. returns
+# every cell's distance to the nearest source as an int32 array, -1 for walls
+# and cells no source reaches
+def wavefront(free, width, sources):
+    dist = np.full(len(free), -1, dtype=np.int32)
+    frontier = np.unique(np.asarray(sources, dtype=np.intp))
+    dist[frontier] = 0
+    offsets = np.array([-width, 1, width, -1], dtype=np.intp)
+    d = 0
+    while frontier.size:
+        d += 1
+        neighbours = (frontier[:, None] + offsets).ravel()
+        neighbours = neighbours[free[neighbours] & (dist[neighbours] < 0)]
+        frontier = np.unique(neighbours)
+        dist[frontier] = d
+    return dist
+
+# the distances from one or more source points to every cell of a map, computed
+# once with wavefront(). afterwards each query is answered from the field alone:
+# a distance in O(1), a path in O(path length)
+class DistanceField:
+    __slots__ = ('sources', 'width', 'dist', 'free')
+
+    def __init__(self, grid, sources):
+        cells, width = pack_grid(grid)
+        self._build(cells, width, sources)
+
+    # builds the field on an already packed map (see pack_grid), sharing its cells
+    @classmethod
+    def packed(cls, cells, width, sources):
+        field = cls.__new__(cls)
+        field._build(cells, width, sources)
+        return field
+
+    def _build(self, cells, width, sources):
+        self.free = np.frombuffer(cells, dtype=np.uint8).view(bool)
+        self.width = width
+        self.sources = [tuple(source) for source in sources]
+        indices = [cell_index(cells, width, source) for source in self.sources]
+        self.dist = wavefront(self.free, width, [i for i in indices if i >= 0])
+
+    # returns the steps from the nearest source to a point, -1 if unreachable
+    def distance(self, point):
+        i = cell_index(self.free, self.width, point)
+        return -1 if i < 0 else int(self.dist[i])
+
+    # returns a shortest path from a point to its nearest source, with the same
+    # up/right/down/left tie-breaking as shortest_path(point, source), or an
+    # empty list if no source can be reached
+    def path_from(self, point):
+        i = cell_index(self.free, self.width, point)
+        if i < 0 or self.dist[i] < 0:
+            return []
+        # a memoryview indexes to plain ints, much faster than numpy scalars
+        dist = memoryview(self.dist)
+        length = dist[i]
+        return walk_path(self.width, i, length, lambda v, step: dist[v] == length - step)
+
+    # returns a shortest path from the nearest source to a point (path_from
+    # reversed, which may break ties differently than a search from the source)
+    def path_to(self, point):
+        return self.path_from(point)[::-1]
+
+    # returns the distances as a (rows, cols) array
+    def to_array(self):
+        rows = len(self.dist) // self.width - 2
+        return self.dist.reshape(rows + 2, self.width)[1:-1, 1:-1]
+
+# labels the connected regions of free cells with a vectorized union-find. every
+# pair of free neighbours (right and down) is an edge; each round hooks the
+# larger root of every edge whose ends are in different trees onto the smaller
+# one, then jumps pointers until every cell points straight at its root. returns
+# the padded-flat labels (0, 1, ... per region, -1 for walls) and the region count
+def label_components(free, width):
+    parent = np.arange(len(free), dtype=np.intp)
+    cells = np.flatnonzero(free)
+    right = cells[free[cells + 1]]
+    down = cells[free[cells + width]]
+    a = np.concatenate([right, down])
+    b = np.concatenate([right + 1, down + width])
+    while a.size:
+        root_a = parent[a]
+        root_b = parent[b]
+        apart = root_a != root_b
+        a, b, root_a, root_b = a[apart], b[apart], root_a[apart], root_b[apart]
+        if not a.size:
+            break
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    labels = np.full(len(free), -1, dtype=np.int32)
+    roots, labels[cells] = np.unique(parent[cells], return_inverse=True)
+    return labels, len(roots)
+
+# the connected regions of a map's free cells, labeled once so that "is there a
+# path" and "same region" questions are an array lookup
+class Components:
+    __slots__ = ('labels', 'width', 'count', 'sizes')
+
+    def __init__(self, grid):
+        cells, width = pack_grid(grid)
+        self._build(cells, width)
+
+    # labels an already packed map (see pack_grid)
+    @classmethod
+    def packed(cls, cells, width):
+        components = cls.__new__(cls)
+        components._build(cells, width)
+        return components
+
+    def _build(self, cells, width):
+        self.width = width
+        self.labels, self.count = label_components(np.frombuffer(cells, dtype=np.uint8).view(bool), width)
+        self.sizes = np.bincount(self.labels[self.labels >= 0], minlength=self.count)
+
+    # returns the region of a point, -1 for walls and points off the map
+    def label(self, point):
+        r, c = point
+        if r < 0 or c < 0 or c >= self.width - 2:
+            return -1
+        i = (r + 1) * self.width + c + 1
+        return int(self.labels[i]) if i < len(self.labels) else -1
+
+    # checks if a path between two points exists: both free and in the same region
+    def connected(self, a, b):
+        label = self.label(a)
+        return label >= 0 and label == self.label(b)
+
+    # returns the number of free cells in a point's region, 0 for walls
+    def size(self, point):
+        label = self.label(point)
+        return int(self.sizes[label]) if label >= 0 else 0
+
+# answers any number of path queries on one map, packed once (see pack_grid).
+# the map's regions are labeled on the first query, so a query between different
+# regions is answered at once without a search. the distance field of every end
+# point asked for is kept (up to max_fields, least recently used dropped first),
+# so repeated queries towards the same hubs cost only the walk
+class PathIndex:
+    def __init__(self, grid, max_fields=64):
+        self.cells, self.width = pack_grid(grid)
+        self.max_fields = max_fields
+        self.fields = {}
+        self._components = None
+
+    # the map's connected regions, labeled on first use
+    @property
+    def components(self):
+        if self._components is None:
+            self._components = Components.packed(self.cells, self.width)
+        return self._components
+
+    # checks if a path between two points exists, in O(1)
+    def connected(self, start, end):
+        return self.components.connected(start, end)
+
+    # returns the distance field of a source, computing it on first use
+    def field(self, source):
+        source = tuple(source)
+        field = self.fields.pop(source, None)
+        if field is None:
+            field = DistanceField.packed(self.cells, self.width, [source])
+            if len(self.fields) >= self.max_fields:
+                self._drop_field(next(iter(self.fields)))
+        self.fields[source] = field
+        return field
+
+    # forgets the cached field of a source
+    def _drop_field(self, source):
+        del self.fields[source]
+
+    # returns the length of a shortest path between two points, -1 if there is none
+    def distance(self, start, end):
+        if not self.connected(start, end):
+            return -1
+        return self.field(end).distance(start)
+
+    # returns the same path as shortest_path(grid, start, end)
+    def shortest_path(self, start, end):
+        if not self.connected(start, end):
+            return []
+        return self.field(end).path_from(start)
+
+# what one DynamicGrid.set_cell() did to the cached results: the sources whose
+# distance fields were repaired with the number of cells whose distance changed,
+# the (start, end) paths dropped from the cache and whether the regions changed
+class GridChange:
+    __slots__ = ('cell', 'wall', 'fields', 'paths', 'regions')
+
+    def __init__(self, cell, wall):
+        self.cell = cell
+        self.wall = wall
+        self.fields = {}
+        self.paths = []
+        self.regions = False
+
+    def __repr__(self):
+        return (f'GridChange(cell={self.cell}, wall={self.wall}, fields={self.fields}, '
+                f'paths={self.paths}, regions={self.regions})')
+
+# the share of a map's cells a field repair may touch; a bigger change (or a
+# source that opens or closes) is cheaper to compute again with wavefront()
+REPAIR_SHARE = 1 / 128
+# the share of a map's cells the search for a split region may visit before the
+# map is labeled again; it costs far less per cell than a field repair
+SPLIT_SHARE = 1 / 32
+
+# a map whose cells open and close over time. it answers the same queries as
+# PathIndex and also caches the paths it returned. when a cell changes, the
+# cached distance fields are repaired in place, touching only the cells whose
+# distance changes, in the spirit of LPA*: an opened cell can only shorten
+# distances, so they are lowered by a breadth first search from it; a closed
+# cell can only lengthen them, so the cells that lost every shortest way to the
+# source are found level by level and settled again from their unaffected
+# neighbours. a change too big for that is computed again from scratch. cached
+# paths that touch a changed cell are dropped
+class DynamicGrid(PathIndex):
+    def __init__(self, grid, max_fields=64):
+        super().__init__(grid, max_fields)
+        self.rows = len(self.cells) // self.width - 2
+        self.cols = self.width - 2
+        self.paths = {}
+        # the packed indices of every cached path's cells
+        self._path_cells = {}
+
+    # checks if a (row, col) point is on the map and free
+    def is_free(self, point):
+        return cell_index(self.cells, self.width, point) >= 0
+
+    # returns the current map as a Grid
+    def to_grid(self):
+        cells = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows + 2, self.width)
+        return Grid.from_walls(cells[1:-1, 1:-1] == 0)
+
+    # returns the same path as shortest_path() on the current map, cached until a change touches it
+    def shortest_path(self, start, end):
+        key = (tuple(start), tuple(end))
+        path = self.paths.get(key)
+        if path is None:
+            path = super().shortest_path(start, end)
+            if path:
+                self.paths[key] = path
+                self._path_cells[key] = {(r + 1) * self.width + c + 1 for r, c in path}
+        return path
+
+    def _drop_field(self, source):
+        super()._drop_field(source)
+        # a path without its field couldn't be checked after a change
+        for key in [key for key in self.paths if key[1] == source]:
+            del self.paths[key]
+            del self._path_cells[key]
+
+    # opens (wall=False) or closes (wall=True) a cell and repairs everything
+    # cached. returns a GridChange listing what was invalidated. raises
+    # ValueError if the point is off the map
+    def set_cell(self, point, wall):
+        r, c = point
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise ValueError(f'{point} is off the map')
+        point = (r, c)
+        change = GridChange(point, wall)
+        v = (r + 1) * self.width + c + 1
+        if self.cells[v] == (not wall):
+            return change
+        self.cells[v] = 0 if wall else 1
+        for source, field in self.fields.items():
+            if source == point:
+                changed = self._rebuild_field(field, source)
+            elif wall:
+                changed = self._close_in_field(field, v, source)
+            else:
+                changed = self._open_in_field(field, v, source)
+            if len(changed):
+                change.fields[source] = len(changed)
+                change.paths.extend(self._drop_paths(source, changed))
+        if self._components is not None:
+            change.regions = self._update_components(v, wall)
+        return change
+
+    def open_cell(self, point):
+        return self.set_cell(point, False)
+
+    def close_cell(self, point):
+        return self.set_cell(point, True)
+
+    # computes a field again with wavefront(). returns the cells whose distance
+    # changed: those that differ now plus the ones a repair given up on had
+    # already lowered (see _open_in_field)
+    def _rebuild_field(self, field, source, lowered=()):
+        old = field.dist
+        v = cell_index(self.cells, self.width, source)
+        field.dist = wavefront(field.free, self.width, [v] if v >= 0 else [])
+        differs = old != field.dist
+        if lowered:
+            differs[lowered] = True
+        return np.flatnonzero(differs)
+
+    # an opened cell: it takes the distance of its best neighbour plus one and
+    # lowers its neighbours' distances breadth first. returns the cells whose
+    # distance changed
+    def _open_in_field(self, field, v, source):
+        dist = memoryview(field.dist)
+        cells = self.cells
+        offsets = (-self.width, 1, self.width, -1)
+        limit = len(cells) * REPAIR_SHARE
+        around = [dist[v + offset] for offset in offsets if dist[v + offset] >= 0]
+        if not around:
+            return []
+        dist[v] = min(around) + 1
+        changed = [v]
+        for u in changed:
+            if len(changed) > limit:
+                # distances only go down, so a cell lowered so far differs from
+                # before even if the rebuild lowers it further
+                return self._rebuild_field(field, source, changed)
+            d = dist[u] + 1
+            for offset in offsets:
+                n = u + offset
+                if cells[n] and (dist[n] < 0 or dist[n] > d):
+                    dist[n] = d
+                    changed.append(n)
+        return changed
+
+    # a closed cell: first the cells whose every neighbour one step closer to
+    # the source was lost are collected, in order of distance, starting from
+    # the closed cell; then they are settled again from the neighbours that
+    # kept their distance, nearest first. returns the cells whose distance changed
+    def _close_in_field(self, field, v, source):
+        dist = memoryview(field.dist)
+        if dist[v] < 0:
+            return []
+        cells = self.cells
+        limit = len(cells) * REPAIR_SHARE
+        offsets = (-self.width, 1, self.width, -1)
+        lost = {v}
+        queue = [v]
+        for u in queue:
+            d = dist[u] + 1
+            for offset in offsets:
+                n = u + offset
+                if n in lost or dist[n] != d:
+                    continue
+                # n is lost unless another neighbour one step closer survives
+                if not any(dist[n + o] == d - 1 and n + o not in lost and cells[n + o] for o in offsets):
+                    lost.add(n)
+                    queue.append(n)
+            if len(queue) > limit:
+                # nothing is changed yet
+                return self._rebuild_field(field, source)
+        for u in queue:
+            dist[u] = -1
+        heap = []
+        for u in queue[1:]:
+            around = [dist[u + offset] for offset in offsets if dist[u + offset] >= 0]
+            if around:
+                heapq.heappush(heap, (min(around) + 1, u))
+        while heap:
+            d, u = heapq.heappop(heap)
+            if dist[u] >= 0:
+                continue
+            dist[u] = d
+            for offset in offsets:
+                n = u + offset
+                if n in lost and cells[n] and dist[n] < 0:
+                    heapq.heappush(heap, (d + 1, n))
+        return queue
+
+    # drops the cached paths towards a source that run through or next to a
+    # changed cell (a neighbour's distance can change the up/right/down/left
+    # choice) or whose start changed. returns their (start, end) keys
+    def _drop_paths(self, source, changed):
+        width = self.width
+        if isinstance(changed, np.ndarray):
+            # a rebuilt field: mark the changed cells and their neighbours in an array
+            marked = np.zeros(len(self.cells), dtype=bool)
+            marked[changed] = True
+            near = marked.copy()
+            near[width:] |= marked[:-width]
+            near[:-width] |= marked[width:]
+            near[1:] |= marked[:-1]
+            near[:-1] |= marked[1:]
+            touches = lambda cells: near[np.fromiter(cells, dtype=np.intp, count=len(cells))].any()
+        else:
+            touched = set(changed)
+            for offset in (-width, 1, width, -1):
+                touched.update(i + offset for i in changed)
+            touches = lambda cells: not cells.isdisjoint(touched)
+        dropped = []
+        for key, cells in list(self._path_cells.items()):
+            if key[1] == source and touches(cells):
+                del self.paths[key]
+                del self._path_cells[key]
+                dropped.append(key)
+        return dropped
+
+    # keeps the region labels current: an opened cell joins (and merges) the
+    # regions around it; a closed cell can only split its region if its free
+    # neighbours aren't linked through the ring of eight cells around it, and
+    # only then are the pieces searched for (see _split_region). returns True
+    # if the regions changed
+    def _update_components(self, v, wall):
+        components = self._components
+        labels = components.labels
+        width = self.width
+        if wall:
+            label = labels[v]
+            labels[v] = -1
+            components.sizes[label] -= 1
+            ring = (-width, -width + 1, 1, width + 1, width, width - 1, -1, -width - 1)
+            free = [bool(self.cells[v + offset]) for offset in ring]
+            # count the runs of free ring cells that contain a side neighbour
+            runs = 0
+            for k in range(0, 8, 2):
+                if free[k] and not (free[k - 1] and free[k - 2]):
+                    runs += 1
+            if not runs and any(free[0::2]):
+                runs = 1  # the whole ring is free
+            if runs > 1:
+                return self._split_region(v, label)
+            return runs != 1
+        around = {int(labels[v + offset]) for offset in (-width, 1, width, -1)} - {-1}
+        if not around:
+            labels[v] = components.count
+            components.count += 1
+            components.sizes = np.append(components.sizes, 1)
+            return True
+        keep = min(around)
+        labels[v] = keep
+        components.sizes[keep] += 1
+        for label in around - {keep}:
+            labels[labels == label] = keep
+            components.sizes[keep] += components.sizes[label]
+            components.sizes[label] = 0
+        return len(around) > 1
+
+    # a closed cell v whose free neighbours may no longer be linked: one breadth
+    # first search per neighbour runs in turns, and searches that meet go on as
+    # one. a search that runs out of cells before all have met has found a piece
+    # cut off from the rest, which gets a new label; the last piece keeps the old
+    # one. so only the smaller pieces are visited, unless the searches grow past
+    # SPLIT_SHARE of the map before they meet; then the map is labeled again.
+    # returns True if the region split
+    def _split_region(self, v, label):
+        components = self._components
+        cells = self.cells
+        limit = len(cells) * SPLIT_SHARE
+        offsets = (-self.width, 1, self.width, -1)
+        seeds = [v + offset for offset in offsets if cells[v + offset]]
+        owner = {seed: i for i, seed in enumerate(seeds)}
+        parent = list(range(len(seeds)))
+        queues = [[seed] for seed in seeds]
+        heads = [0] * len(seeds)
+        alive = list(range(len(seeds)))
+        split = False
+        while len(alive) > 1:
+            for i in alive[:]:
+                if parent[i] != i:
+                    continue
+                queue = queues[i]
+                if heads[i] == len(queue):
+                    # every cell reached by search i is its piece
+                    components.labels[queue] = components.count
+                    components.count += 1
+                    components.sizes = np.append(components.sizes, len(queue))
+                    components.sizes[label] -= len(queue)
+                    alive.remove(i)
+                    split = True
+                    if len(alive) == 1:
+                        break
+                    continue
+                u = queue[heads[i]]
+                heads[i] += 1
+                for offset in offsets:
+                    n = u + offset
+                    if not cells[n]:
+                        continue
+                    j = owner.get(n)
+                    if j is None:
+                        owner[n] = i
+                        queue.append(n)
+                        continue
+                    while parent[j] != j:
+                        j = parent[j]
+                    if j != i:
+                        # the searches met: i goes on with j's cells too
+                        parent[j] = i
+                        other = queues[j]
+                        queue[heads[i]:heads[i]] = other[:heads[j]]
+                        heads[i] += heads[j]
+                        queue.extend(other[heads[j]:])
+                        alive.remove(j)
+                if len(alive) == 1:
+                    break
+                if len(owner) > limit:
+                    regions = int(np.count_nonzero(components.sizes))
+                    self._components = Components.packed(cells, self.width)
+                    return split or self._components.count != regions
+        return split
+
+# path indices of the map files already loaded, with the file's modification
+# time and size so an edited map is read again
+_path_indices = {}
+
+# returns the PathIndex of a map file, reading the file only when it changed
+def load_path_index(filename):
+    stat = os.stat(filename)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _path_indices.get(filename)
+    if cached is None or cached[0] != key:
+        cached = _path_indices[filename] = (key, PathIndex(read_grid(filename)))
+    return cached[1]
+
 def Ex_1():
     while True:
         section = int(input('Please enter the section you would like to execute.(for exit enter 4): '))
@@ -75,72 +952,16 @@ def Ex_1():
 def Ex_2():
     while True:
         section = int(input('Please enter the section you would like to execute.(for exit enter 4): '))
-        # opens a file with a matrix inside and returns a matrix
+        # opens a file with a matrix inside and returns a matrix. it stays a list
+        # of rows because section 1 prints the values as they are in the file
         def read_map(filename):
             with open(filename, 'r') as f:
                 return [list(map(int, line.strip().split())) for line in f if line.strip()]
 
-        #checks if a coordinate is in the matrix has zero and wasn't visited
-        def is_valid(x, y, grid, visited):
-            n = len(grid)
-            return 0 <= x < n and 0 <= y < n and (grid[x][y] == 0) and (x,y) not in visited
-
-        #creates an n size matrix with false for every cell
-        def create_false_matrix(n, row=0):
-            if row == n:
-                return []
-            return [[False] * n] + create_false_matrix(n, row + 1)
-
-        #finds shortest path using dfs
+        #finds the shortest path with the search engine above
         #returns best path (a tuple list of coordinates)
         def find_shortest_path(grid, start, end):
-            best_path = []
-
-            def dfs(r, c, path, visited):
-                nonlocal best_path
-
-                if (r, c) == end:
-                    if not best_path or len(path) < len(best_path):
-                        best_path = path[:]
-                    return
-
-                #you didn't allow for
-                nr, nc = r - 1, c # up
-                if is_valid(nr, nc, grid, visited):
-                    visited.add((nr, nc))
-                    path.append((nr, nc))
-                    dfs(nr, nc, path, visited)
-                    path.pop()
-                    visited.remove((nr, nc))
-
-                nr, nc = r, c + 1  # right
-                if is_valid(nr, nc, grid, visited):
-                    visited.add((nr, nc))
-                    path.append((nr, nc))
-                    dfs(nr, nc, path, visited)
-                    path.pop()
-                    visited.remove((nr, nc))
-
-                nr, nc = r + 1, c  # down
-                if is_valid(nr, nc, grid, visited):
-                    visited.add((nr, nc))
-                    path.append((nr, nc))
-                    dfs(nr, nc, path, visited)
-                    path.pop()
-                    visited.remove((nr, nc))
-
-                nr, nc = r, c - 1 # left
-                if is_valid(nr, nc, grid, visited):
-                    visited.add((nr, nc))
-                    path.append((nr, nc))
-                    dfs(nr, nc, path, visited)
-                    path.pop()
-                    visited.remove((nr, nc))
-
-            if grid[start[0]][start[1]] == 0 and grid[end[0]][end[1]] == 0:
-                dfs(start[0], start[1], [start], {start})
-
-            return best_path
+            return shortest_path(grid, start, end)
 
 
         if section == 1:
@@ -148,10 +969,11 @@ def Ex_2():
             print(read_map(map_name + '.txt'))
         elif section == 2:
             map_name = input('enter map name: ')
-            visited = create_false_matrix(len(read_map(map_name + '.txt')))
+            grid = read_grid(map_name + '.txt')
+            visited = Bitmap(grid.rows, grid.cols)
             x = int(input('enter x: '))
             y = int(input('enter y: '))
-            print(is_valid(x, y, read_map(map_name + '.txt'), visited))
+            print(grid_is_valid(grid, x, y, visited))
         elif section == 3:
 
             map_name = input('enter map name: ')
@@ -159,7 +981,7 @@ def Ex_2():
             start_point = tuple(map(int, start_point.split()))
             end_point = input('enter the end point with space \'x y\': ')
             end_point = tuple(map(int, end_point.split()))
-            path = find_shortest_path(read_map(map_name + '.txt'), start_point, end_point)
+            path = load_path_index(map_name + '.txt').shortest_path(start_point, end_point)
             if path:
                 print('Shortest path found:')
                 for p in path: